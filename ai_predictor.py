@@ -25,7 +25,7 @@ class FeatureExtractor:
                 c.high - c.low,
                 c.delta,
                 c.total_volume,
-                len(c.levels),
+                c.level_count,
                 c.total_ask / max(c.total_bid, 0.01),
                 (c.close - va.poc) / max(c.close, 1) * 100,
                 va.high - va.low,
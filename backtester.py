@@ -170,6 +170,6 @@ class Backtester:
                     timestamp=int(data.get("T", data.get("timestamp", 0))),
                     price=float(data.get("p", data.get("price", 0))),
                     quantity=float(data.get("q", data.get("quantity", 0))),
-                    is_buyer_maker=data.get("m", data.get("is_buyer_maker", False)),
+                    is_buyer_maker=bool(data.get("m", data.get("is_buyer_maker", False))),
                 ))
         return ticks
@@ -1,5 +1,5 @@
 import logging
-from typing import Optional
+from typing import Optional, Callable
 from fastapi import FastAPI, Request
 from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.templating import Jinja2Templates
@@ -14,11 +14,14 @@ templates = Jinja2Templates(directory="templates")
 
 app.state.db = None
 app.state.bot_state = {}
+app.state.on_emergency_close = None
 
 
-def init_dashboard(database: DatabaseManager, config: Config, bot_state: dict):
+def init_dashboard(database: DatabaseManager, config: Config, bot_state: dict,
+                   on_emergency_close: Optional[Callable[[], None]] = None):
     app.state.db = database
     app.state.bot_state = bot_state
+    app.state.on_emergency_close = on_emergency_close
     logger.info(f"Dashboard init: bot_state has {len(bot_state)} keys: {list(bot_state.keys())}")
 
 
@@ -96,4 +99,6 @@ async def api_stats():
 @app.post("/api/emergency-close")
 async def api_emergency_close():
     app.state.bot_state["emergency_close"] = True
+    if app.state.on_emergency_close:
+        app.state.on_emergency_close()
     return JSONResponse({"status": "Emergency close triggered"})
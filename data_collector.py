@@ -1,4 +1,4 @@
-import json
+import orjson
 import asyncio
 import logging
 from typing import Optional, Dict, Callable, Awaitable
@@ -83,10 +83,10 @@ class DataCollector:
                 await asyncio.sleep(self._reconnect_delay)
                 self._reconnect_delay = min(self._reconnect_delay * 2, self._max_reconnect_delay)
 
-    async def _process_message(self, raw: str, use_combined: bool = False):
+    async def _process_message(self, raw: str | bytes, use_combined: bool = False):
         try:
-            msg = json.loads(raw)
-        except json.JSONDecodeError:
+            msg = orjson.loads(raw)
+        except orjson.JSONDecodeError:
             return
 
         if use_combined:
@@ -102,12 +102,7 @@ class DataCollector:
         if not ccxt_symbol:
             return
 
-        tick = RawTick(
-            timestamp=int(data["T"]),
-            price=float(data["p"]),
-            quantity=float(data["q"]),
-            is_buyer_maker=data["m"],
-        )
+        tick = RawTick.from_binance(data)
 
         self._last_prices[ccxt_symbol] = tick.price
         self._tick_counts[ccxt_symbol] = self._tick_counts.get(ccxt_symbol, 0) + 1
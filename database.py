@@ -3,7 +3,7 @@ import json
 import logging
 from datetime import datetime, date
 from models import Position, PositionStatus, DailyStats, Side, StrategyType
-from typing import Optional, List
+from typing import Optional, List, Tuple
 
 logger = logging.getLogger("database")
 
@@ -64,6 +64,17 @@ class DatabaseManager:
                 win_rate REAL DEFAULT 0.0
             );
 
+            -- Trade learner aggregates (kind = symbol | strategy | combo), kept current on write
+            CREATE TABLE IF NOT EXISTS learner_stats (
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                wins INTEGER DEFAULT 0,
+                losses INTEGER DEFAULT 0,
+                total_pnl REAL DEFAULT 0.0,
+                trades INTEGER DEFAULT 0,
+                PRIMARY KEY (kind, key)
+            );
+
             CREATE INDEX IF NOT EXISTS idx_positions_status ON positions(status);
             CREATE INDEX IF NOT EXISTS idx_positions_opened ON positions(opened_at);
             CREATE INDEX IF NOT EXISTS idx_signals_ts ON signals_log(timestamp);
@@ -141,6 +152,7 @@ class DatabaseManager:
         """, (PositionStatus.CLOSED.value, closed_at, exit_price, pnl, pnl_pct, position_id))
         await self.db.commit()
         await self._update_daily_stats(pnl)
+        await self._update_learner_stats(position_id, pnl)
 
     async def get_recent_positions(self, limit: int = 50) -> List[Position]:
         cursor = await self.db.execute(
@@ -193,6 +205,51 @@ class DatabaseManager:
               stats.total_pnl, stats.max_drawdown, stats.win_rate))
         await self.db.commit()
 
+    async def _update_learner_stats(self, position_id: str, pnl: float):
+        cursor = await self.db.execute(
+            "SELECT symbol, strategy FROM positions WHERE id = ?", (position_id,)
+        )
+        row = await cursor.fetchone()
+        if row:
+            await self.add_learner_stats([("symbol", row[0]), ("strategy", row[1])], pnl > 0, pnl)
+
+    async def add_learner_stats(self, keys: List[Tuple[str, str]], won: bool, pnl: float):
+        """Count one closed trade against each (kind, key) aggregate."""
+        wins, losses = (1, 0) if won else (0, 1)
+        await self.db.executemany("""
+            INSERT INTO learner_stats (kind, key, wins, losses, total_pnl, trades)
+            VALUES (?, ?, ?, ?, ?, 1)
+            ON CONFLICT (kind, key) DO UPDATE SET
+                wins = wins + excluded.wins,
+                losses = losses + excluded.losses,
+                total_pnl = total_pnl + excluded.total_pnl,
+                trades = trades + 1
+        """, [(kind, key, wins, losses, pnl) for kind, key in keys])
+        await self.db.commit()
+
+    async def replace_learner_stats(self, rows: List[tuple]):
+        """Overwrite aggregates with (kind, key, wins, losses, total_pnl, trades) rows."""
+        await self.db.executemany("""
+            INSERT OR REPLACE INTO learner_stats (kind, key, wins, losses, total_pnl, trades)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, rows)
+        await self.db.commit()
+
+    async def get_learner_stats(self) -> List[tuple]:
+        """All aggregates as (kind, key, wins, losses, total_pnl, trades), in insertion order."""
+        cursor = await self.db.execute(
+            "SELECT kind, key, wins, losses, total_pnl, trades FROM learner_stats ORDER BY rowid"
+        )
+        return [tuple(row) for row in await cursor.fetchall()]
+
+    async def get_closed_positions(self) -> List[Position]:
+        cursor = await self.db.execute(
+            "SELECT * FROM positions WHERE status = ? AND pnl IS NOT NULL ORDER BY opened_at DESC",
+            (PositionStatus.CLOSED.value,)
+        )
+        rows = await cursor.fetchall()
+        return [self._row_to_position(row) for row in rows]
+
     async def get_all_daily_stats(self, limit: int = 30) -> List[DailyStats]:
         cursor = await self.db.execute(
             "SELECT * FROM daily_stats ORDER BY date DESC LIMIT ?", (limit,)
@@ -3,6 +3,7 @@ import asyncio
 import aiohttp
 from typing import Dict, Optional
 from config import Config
+from models import BiasResult
 
 logger = logging.getLogger("derivatives")
 
@@ -75,14 +76,14 @@ class DerivativesAnalyzer:
     def get_data(self, symbol: str) -> dict:
         return self._cache.get(symbol, {})
 
-    def get_signal_bias(self, symbol: str) -> dict:
+    def get_signal_bias(self, symbol: str) -> BiasResult:
         """
         Returns a bias adjustment based on derivatives data.
         positive bias = bullish confirmation, negative = bearish.
         """
         data = self.get_data(symbol)
         if not data:
-            return {"bias": 0, "reasons": []}
+            return BiasResult()
 
         bias = 0
         reasons = []
@@ -111,7 +112,7 @@ class DerivativesAnalyzer:
             bias += 5
             reasons.append(f"Top traders heavy short ({tls:.2f})")
 
-        return {"bias": bias, "reasons": reasons}
+        return BiasResult(bias=bias, reason="; ".join(reasons))
 
     async def stop(self):
         self._running = False
@@ -1,12 +1,16 @@
 import math
 import logging
+import numpy as np
 from typing import Optional, Dict, List
 from collections import deque
-from models import RawTick, FootprintLevel, FootprintCandle, ValueArea
+from models import RawTick, FootprintCandle, ValueArea
 from config import Config
 
 logger = logging.getLogger("footprint")
 
+# Enough history for every per-candle consumer (regime/liquidity use 30)
+_RECENT_WINDOW = 30
+
 
 class FootprintEngine:
     """Builds footprint candles from raw tick data in real-time."""
@@ -17,12 +21,21 @@ class FootprintEngine:
         self.imbalance_ratio = sym_cfg.get("imbalance_ratio", config.imbalance_ratio)
         self.imbalance_volume = sym_cfg.get("imbalance_volume", config.imbalance_volume)
         self.stacked_min = sym_cfg.get("stacked_imbalance_min", config.stacked_imbalance_min)
+        self.min_candle_volume = sym_cfg.get("min_candle_volume", 0.0)
         self.candle_ms = config.timeframe_minutes * 60 * 1000
 
         self.current_candle: Optional[FootprintCandle] = None
         self.completed_candles: deque[FootprintCandle] = deque(maxlen=500)
         self.cumulative_delta: float = 0.0
         self.cvd_history: deque[float] = deque(maxlen=500)
+        self.candle_count: int = 0
+        self._cvd_trend_cache: Dict[int, dict] = {}
+        # High-low ranges of the last 10 closed candles, with running sum/count of the non-zero ones
+        self._range_ring: deque[float] = deque(maxlen=10)
+        self._range_sum: float = 0.0
+        self._range_count: int = 0
+        # Tail of completed_candles shared by per-candle consumers; rebuilt lazily after a close
+        self._recent: Optional[tuple] = None
 
     def _price_to_level(self, price: float) -> float:
         return math.floor(price / self.scale) * self.scale
@@ -51,17 +64,11 @@ class FootprintEngine:
         candle = self.current_candle
         level_price = self._price_to_level(tick.price)
 
-        if level_price not in candle.levels:
-            candle.levels[level_price] = FootprintLevel(price=level_price)
-
-        level = candle.levels[level_price]
-        level.trades += 1
-
         if tick.is_buy:
-            level.ask_volume += tick.quantity
+            candle.update_level(level_price, 0.0, tick.quantity)
             candle.total_ask += tick.quantity
         else:
-            level.bid_volume += tick.quantity
+            candle.update_level(level_price, tick.quantity, 0.0)
             candle.total_bid += tick.quantity
 
         candle.total_trades += 1
@@ -71,57 +78,98 @@ class FootprintEngine:
         if tick.price < candle.low:
             candle.low = tick.price
 
+    def merge_candle(self, candle: FootprintCandle):
+        """Fold a completed lower-timeframe candle into the current candle."""
+        if self.current_candle is None:
+            self.current_candle = FootprintCandle(
+                timestamp=self._candle_start(candle.timestamp), open=candle.open,
+            )
+        cur = self.current_candle
+        for price, bid, ask, trades in zip(
+            candle.price_array.tolist(), candle.bid_array.tolist(),
+            candle.ask_array.tolist(), candle.trade_array.tolist(),
+        ):
+            cur.update_level(price, bid, ask, trades)
+
+        cur.total_bid += candle.total_bid
+        cur.total_ask += candle.total_ask
+        cur.total_trades += candle.total_trades
+        cur.close = candle.close
+        if candle.high > cur.high:
+            cur.high = candle.high
+        if candle.low < cur.low:
+            cur.low = candle.low
+
+    def close_if_elapsed(self, timestamp: int) -> Optional[FootprintCandle]:
+        """Close the current candle once `timestamp` falls in a later period."""
+        if self.current_candle is None or self._candle_start(timestamp) <= self.current_candle.timestamp:
+            return None
+        completed = self._close_candle()
+        self.current_candle = None
+        return completed
+
     def _close_candle(self) -> FootprintCandle:
         candle = self.current_candle
         self.cumulative_delta += candle.delta
         self.cvd_history.append(self.cumulative_delta)
         self.completed_candles.append(candle)
+        self.candle_count += 1
+        self._cvd_trend_cache.clear()
+        self._recent = None
+        self._push_range(candle.high - candle.low)
         logger.debug(
             f"Candle closed | O:{candle.open} H:{candle.high} L:{candle.low} C:{candle.close} "
             f"Delta:{candle.delta:+.2f} CVD:{self.cumulative_delta:+.2f} "
-            f"Levels:{len(candle.levels)} Trades:{candle.total_trades}"
+            f"Levels:{candle.level_count} Trades:{candle.total_trades}"
         )
         return candle
 
+    def _push_range(self, rng: float):
+        ring = self._range_ring
+        if len(ring) == ring.maxlen:
+            old = ring[0]
+            if old > 0:
+                self._range_sum -= old
+                self._range_count -= 1
+        ring.append(rng)
+        if rng > 0:
+            self._range_sum += rng
+            self._range_count += 1
+
+    def atr_proxy(self) -> Optional[float]:
+        """Mean non-zero candle range over the last 10 closes; None until 3 candles have closed."""
+        if len(self._range_ring) < 3:
+            return None
+        if self._range_count == 0:
+            return 0.0
+        return self._range_sum / self._range_count
+
     def get_stacked_imbalances(self, candle: FootprintCandle) -> dict:
         """Detect stacked buy and sell imbalances in a candle."""
-        sorted_prices = sorted(candle.levels.keys())
-        buy_stacks = []
-        sell_stacks = []
-        current_buy = []
-        current_sell = []
-
-        for price in sorted_prices:
-            level = candle.levels[price]
-            if level.total_volume < self.imbalance_volume:
-                if len(current_buy) >= self.stacked_min:
-                    buy_stacks.append(list(current_buy))
-                if len(current_sell) >= self.stacked_min:
-                    sell_stacks.append(list(current_sell))
-                current_buy = []
-                current_sell = []
-                continue
-
-            if level.imbalance_ratio >= self.imbalance_ratio:
-                current_buy.append(price)
-            else:
-                if len(current_buy) >= self.stacked_min:
-                    buy_stacks.append(list(current_buy))
-                current_buy = []
-
-            if level.reverse_imbalance_ratio >= self.imbalance_ratio:
-                current_sell.append(price)
-            else:
-                if len(current_sell) >= self.stacked_min:
-                    sell_stacks.append(list(current_sell))
-                current_sell = []
-
-        if len(current_buy) >= self.stacked_min:
-            buy_stacks.append(list(current_buy))
-        if len(current_sell) >= self.stacked_min:
-            sell_stacks.append(list(current_sell))
-
-        return {"buy": buy_stacks, "sell": sell_stacks}
+        if candle.level_count == 0:
+            return {"buy": [], "sell": []}
+
+        order = np.argsort(candle.price_array)
+        prices = candle.price_array[order]
+        bid = candle.bid_array[order]
+        ask = candle.ask_array[order]
+
+        # Thin levels break both stacks; ratio tests mirror FootprintLevel.imbalance_ratio
+        enough = (bid + ask) >= self.imbalance_volume
+        buy_mask = enough & np.where(bid > 0, ask >= bid * self.imbalance_ratio, ask > 0)
+        sell_mask = enough & np.where(ask > 0, bid >= ask * self.imbalance_ratio, bid > 0)
+
+        return {
+            "buy": [prices[s:e].tolist() for s, e in self._runs(buy_mask)],
+            "sell": [prices[s:e].tolist() for s, e in self._runs(sell_mask)],
+        }
+
+    def _runs(self, mask: np.ndarray) -> list:
+        """(start, end) bounds of consecutive True runs at least stacked_min long."""
+        edges = np.diff(np.concatenate(([0], mask.view(np.int8), [0])))
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+        return [(s, e) for s, e in zip(starts.tolist(), ends.tolist()) if e - s >= self.stacked_min]
 
     def detect_absorption(self, candle: FootprintCandle) -> dict:
         """
@@ -129,44 +177,37 @@ class FootprintEngine:
         dominates but price barely moved past that level — indicating passive
         orders absorbing the aggression.
         """
-        if candle.total_volume == 0 or len(candle.levels) < 3:
+        n = candle.level_count
+        if candle.total_volume == 0 or n < 3:
             return {"support": [], "resistance": []}
 
-        avg_volume = candle.total_volume / len(candle.levels)
+        avg_volume = candle.total_volume / n
         volume_threshold = avg_volume * 5
 
-        support_absorptions = []
-        resistance_absorptions = []
-
-        sorted_prices = sorted(candle.levels.keys())
-        low_zone = sorted_prices[:max(len(sorted_prices) // 4, 1)]
-        high_zone = sorted_prices[-max(len(sorted_prices) // 4, 1):]
-
-        for price, level in candle.levels.items():
-            if level.total_volume < volume_threshold:
-                continue
-
-            # Support absorption: heavy selling (bid_vol) near lows but price held
-            if price in low_zone and level.bid_volume > level.ask_volume * 1.5:
-                if candle.close > price:
-                    support_absorptions.append({
-                        "price": price, "bid_vol": level.bid_volume,
-                        "ask_vol": level.ask_volume,
-                        "strength": level.total_volume / avg_volume,
-                    })
-
-            # Resistance absorption: heavy buying (ask_vol) near highs but price rejected
-            if price in high_zone and level.ask_volume > level.bid_volume * 1.5:
-                if candle.close < price:
-                    resistance_absorptions.append({
-                        "price": price, "bid_vol": level.bid_volume,
-                        "ask_vol": level.ask_volume,
-                        "strength": level.total_volume / avg_volume,
-                    })
-
-        support_absorptions = sorted(support_absorptions, key=lambda x: x["strength"], reverse=True)[:2]
-        resistance_absorptions = sorted(resistance_absorptions, key=lambda x: x["strength"], reverse=True)[:2]
-        return {"support": support_absorptions, "resistance": resistance_absorptions}
+        prices = candle.price_array
+        bid = candle.bid_array
+        ask = candle.ask_array
+        heavy = (bid + ask) >= volume_threshold
+
+        zone = max(n // 4, 1)
+        sorted_prices = np.sort(prices)
+        in_low_zone = prices <= sorted_prices[zone - 1]
+        in_high_zone = prices >= sorted_prices[-zone]
+
+        # Support absorption: heavy selling (bid_vol) near lows but price held
+        support_mask = heavy & in_low_zone & (bid > ask * 1.5) & (candle.close > prices)
+        # Resistance absorption: heavy buying (ask_vol) near highs but price rejected
+        resistance_mask = heavy & in_high_zone & (ask > bid * 1.5) & (candle.close < prices)
+
+        def zones(mask: np.ndarray) -> list:
+            found = [
+                {"price": float(prices[i]), "bid_vol": float(bid[i]), "ask_vol": float(ask[i]),
+                 "strength": float(bid[i] + ask[i]) / avg_volume}
+                for i in np.flatnonzero(mask)
+            ]
+            return sorted(found, key=lambda x: x["strength"], reverse=True)[:2]
+
+        return {"support": zones(support_mask), "resistance": zones(resistance_mask)}
 
     def detect_exhaustion(self, lookback: int = 5) -> Optional[dict]:
         """
@@ -177,7 +218,7 @@ class FootprintEngine:
         if len(self.completed_candles) < lookback + 1:
             return None
 
-        recent = list(self.completed_candles)[-lookback:]
+        recent = self.recent_candles()[-lookback:]
         latest = recent[-1]
         prior = recent[:-1]
 
@@ -205,7 +246,15 @@ class FootprintEngine:
         return None
 
     def get_cvd_trend(self, lookback: int = 10) -> dict:
-        """Analyze CVD trend direction and strength."""
+        """Analyze CVD trend direction and strength (memoized until the next candle close)."""
+        cached = self._cvd_trend_cache.get(lookback)
+        if cached is not None:
+            return cached
+        trend = self._compute_cvd_trend(lookback)
+        self._cvd_trend_cache[lookback] = trend
+        return trend
+
+    def _compute_cvd_trend(self, lookback: int) -> dict:
         if len(self.cvd_history) < lookback:
             return {"direction": "neutral", "strength": 0, "values": list(self.cvd_history)}
 
@@ -224,7 +273,17 @@ class FootprintEngine:
 
         return {"direction": direction, "strength": strength, "slope": slope, "values": values}
 
+    def recent_candles(self) -> tuple:
+        """Last _RECENT_WINDOW completed candles, cached until the next close."""
+        if self._recent is None:
+            dq = self.completed_candles
+            k = min(len(dq), _RECENT_WINDOW)
+            self._recent = tuple(dq[i] for i in range(-k, 0))
+        return self._recent
+
     def get_last_n_candles(self, n: int) -> list[FootprintCandle]:
+        if n <= _RECENT_WINDOW:
+            return list(self.recent_candles()[-n:])
         return list(self.completed_candles)[-n:]
 
     @property
@@ -2,12 +2,13 @@ import asyncio
 import signal
 import logging
 import time
+import numpy as np
 import uvicorn
-from typing import Dict
+from typing import Dict, Optional
 from rich.logging import RichHandler
 
 from config import Config
-from models import RawTick, FootprintCandle
+from models import RawTick, FootprintCandle, Position, side_signs, pnl_batch
 from database import DatabaseManager
 from footprint_engine import FootprintEngine
 from signal_detector import SignalDetector
@@ -94,6 +95,11 @@ class OrderFlowBot:
         self.pipelines: Dict[str, MarketPipeline] = {}
         self._running = False
         self._start_time = 0
+        self._total_candles = 0
+        # Wakes the position monitor on meaningful price moves / emergency close
+        self._monitor_wakeup = asyncio.Event()
+        self._monitor_ref_prices: Dict[str, float] = {}
+        self._shutdown_event = asyncio.Event()
 
         self.bot_state = {
             "running": False,
@@ -118,26 +124,38 @@ class OrderFlowBot:
         logger.info("=" * 60)
 
         # Start dashboard IMMEDIATELY for Railway healthcheck
-        init_dashboard(self.db, self.config, self.bot_state)
+        init_dashboard(self.db, self.config, self.bot_state,
+                       on_emergency_close=self._monitor_wakeup.set)
 
-        def _shutdown(sig, frame):
-            self._running = False
-
-        signal.signal(signal.SIGINT, _shutdown)
-        signal.signal(signal.SIGTERM, _shutdown)
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self._request_shutdown)
+            except NotImplementedError:  # Windows event loops
+                signal.signal(sig, lambda s, f: loop.call_soon_threadsafe(self._request_shutdown))
 
         tasks = [
             asyncio.create_task(self._run_dashboard()),
             asyncio.create_task(self._delayed_init(symbols)),
         ]
+        main_tasks = asyncio.gather(*tasks, return_exceptions=True)
+        stop_waiter = asyncio.create_task(self._shutdown_event.wait())
 
         try:
-            await asyncio.gather(*tasks, return_exceptions=True)
+            await asyncio.wait({main_tasks, stop_waiter}, return_when=asyncio.FIRST_COMPLETED)
         except Exception as e:
             logger.error(f"Fatal error: {e}")
         finally:
+            # Cancelling _delayed_init also cancels the background tasks it gathers
+            stop_waiter.cancel()
+            main_tasks.cancel()
             await self._shutdown()
 
+    def _request_shutdown(self):
+        logger.info("Shutdown requested")
+        self._running = False
+        self._shutdown_event.set()
+
     async def _delayed_init(self, symbols):
         """Heavy initialization runs AFTER the web server is up."""
         await asyncio.sleep(2)
@@ -209,6 +227,11 @@ class OrderFlowBot:
         self.health.record_tick()
         self.correlation.record_price(symbol, tick.price)
 
+        ref = self._monitor_ref_prices.get(symbol, 0.0)
+        if ref <= 0 or abs(tick.price - ref) / ref > 0.0005:
+            self._monitor_ref_prices[symbol] = tick.price
+            self._monitor_wakeup.set()
+
         pipeline.mtf.process_tick(tick)
         completed = pipeline.footprint.process_tick(tick)
         if completed is not None:
@@ -224,6 +247,7 @@ class OrderFlowBot:
     async def _process_candle(self, symbol: str, pipeline: MarketPipeline,
                               candle: FootprintCandle):
         pipeline.candle_count += 1
+        self._total_candles += 1
         pipeline.volume_profile.add_candle(candle)
         logger.info(
             f"━━━ [{symbol}] CANDLE #{pipeline.candle_count} ━━━ "
@@ -301,7 +325,7 @@ class OrderFlowBot:
 
         deriv_bias = self.derivatives.get_signal_bias(symbol)
         sent_bias = self.sentiment.get_signal_bias(symbol)
-        htf_data = pipeline.mtf.get_htf_bias()
+        htf_bias = pipeline.mtf.get_htf_bias_fast()
         ai_bias = pipeline.predictor.get_signal_bias(all_candles)
         ob_bias = self.orderbook.get_signal_bias(symbol)
         vp_data = pipeline.volume_profile.get_combined_bias(candle.close)
@@ -317,9 +341,9 @@ class OrderFlowBot:
                 sweep_bias += 12
 
         total_bias = (
-            deriv_bias.get("bias", 0) + sent_bias + htf_data.get("bias", 0)
+            deriv_bias.bias + sent_bias + htf_bias
             + ai_bias + ob_bias + sweep_bias
-            + vp_data.get("bias", 0) + learner_data.get("bias", 0)
+            + vp_data.bias + learner_data.bias
             + strat_bias + sym_bias
         )
 
@@ -330,10 +354,10 @@ class OrderFlowBot:
 
         logger.info(
             f"[{symbol}] Score: {original_score:.0f} → {trade_signal.confluence_score:.0f} "
-            f"(deriv={deriv_bias.get('bias', 0):+d} sent={sent_bias:+d} "
-            f"htf={htf_data.get('bias', 0):+d} ai={ai_bias:+d} "
+            f"(deriv={deriv_bias.bias:+d} sent={sent_bias:+d} "
+            f"htf={htf_bias:+d} ai={ai_bias:+d} "
             f"ob={ob_bias:+d} sweep={sweep_bias:+d} "
-            f"vp={vp_data.get('bias', 0):+d} learn={learner_data.get('bias', 0):+d} "
+            f"vp={vp_data.bias:+d} learn={learner_data.bias:+d} "
             f"strat={strat_bias:+d} sym={sym_bias:+d})"
         )
 
@@ -346,43 +370,47 @@ class OrderFlowBot:
             logger.warning(f"[{symbol}] Learner recommends skipping: {skip_check['reason']}")
             return
 
-        cvd_trend = pipeline.footprint.get_cvd_trend(10)
         sent_data = self.sentiment.get_data(symbol)
         deriv_data = self.derivatives.get_data(symbol)
-        pred = pipeline.predictor.predict(all_candles)
-        ob_data = self.orderbook.get_analysis(symbol)
-        vp_analysis = pipeline.volume_profile.daily.get_value_area()
-        sym_stats = self.learner._symbol_stats.get(symbol, {})
-        combo_stats = learner_data
-
-        llm_ctx = {
-            "symbol": symbol, "side": trade_signal.side.value,
-            "strategy": trade_signal.strategy.value,
-            "score": trade_signal.confluence_score,
-            "entry": trade_signal.entry_price, "sl": trade_signal.stop_loss, "tp": trade_signal.take_profit,
-            "signals": [s.description for s in detected_signals],
-            "regime": regime.value,
-            "cvd_direction": cvd_trend["direction"], "cvd_strength": cvd_trend["strength"],
-            "cvd": pipeline.footprint.cumulative_delta,
-            "session": self.session.get_current_session().get("session", "?"),
-            "session_quality": self.session.get_current_session().get("quality", "?"),
-            "funding_rate": deriv_data.get("funding_rate", 0),
-            "open_interest": deriv_data.get("open_interest", 0),
-            "ls_ratio": deriv_data.get("long_short_ratio", 0),
-            "sentiment_label": sent_data.get("label", "?"),
-            "sentiment_score": sent_data.get("score", 0),
-            "ai_direction": pred.get("direction", "?"), "ai_confidence": pred.get("confidence", 0),
-            "daily_poc": vp_analysis.get("poc", 0),
-            "price_vs_poc": vp_data.get("daily", {}).get("reason", "?"),
-            "book_imbalance": ob_data.get("imbalance", 0),
-            "bid_walls": ob_data.get("bid_wall_count", 0),
-            "ask_walls": ob_data.get("ask_wall_count", 0),
-            "symbol_winrate": sym_stats.get("wins", 0) / max(sym_stats.get("trades", 1), 1) * 100,
-            "symbol_trades": sym_stats.get("trades", 0),
-            "combo_winrate": combo_stats.get("win_rate", 0),
-            "combo_trades": combo_stats.get("trades", 0),
-            "sweep": sweeps[0]["description"] if sweeps else None,
-        }
+
+        # Only gather the full context when the LLM will actually read it
+        llm_ctx = {}
+        if self.llm.enabled:
+            pred = pipeline.predictor.predict(all_candles)
+            ob_data = self.orderbook.get_analysis(symbol)
+            vp_analysis = pipeline.volume_profile.daily.get_value_area()
+            sym_stats = self.learner._symbol_stats.get(symbol, {})
+            combo_stats = learner_data.details
+            session = self.session.get_current_session()
+
+            llm_ctx = {
+                "symbol": symbol, "side": trade_signal.side.value,
+                "strategy": trade_signal.strategy.value,
+                "score": trade_signal.confluence_score,
+                "entry": trade_signal.entry_price, "sl": trade_signal.stop_loss, "tp": trade_signal.take_profit,
+                "signals": [s.description for s in detected_signals],
+                "regime": regime.value,
+                "cvd_direction": cvd_trend["direction"], "cvd_strength": cvd_trend["strength"],
+                "cvd": pipeline.footprint.cumulative_delta,
+                "session": session.get("session", "?"),
+                "session_quality": session.get("quality", "?"),
+                "funding_rate": deriv_data.get("funding_rate", 0),
+                "open_interest": deriv_data.get("open_interest", 0),
+                "ls_ratio": deriv_data.get("long_short_ratio", 0),
+                "sentiment_label": sent_data.get("label", "?"),
+                "sentiment_score": sent_data.get("score", 0),
+                "ai_direction": pred.get("direction", "?"), "ai_confidence": pred.get("confidence", 0),
+                "daily_poc": vp_analysis.get("poc", 0),
+                "price_vs_poc": vp_data.details["daily"].reason,
+                "book_imbalance": ob_data.get("imbalance", 0),
+                "bid_walls": ob_data.get("bid_wall_count", 0),
+                "ask_walls": ob_data.get("ask_wall_count", 0),
+                "symbol_winrate": sym_stats.get("wins", 0) / max(sym_stats.get("trades", 1), 1) * 100,
+                "symbol_trades": sym_stats.get("trades", 0),
+                "combo_winrate": combo_stats.get("win_rate", 0),
+                "combo_trades": combo_stats.get("trades", 0),
+                "sweep": sweeps[0]["description"] if sweeps else None,
+            }
         llm_result = await self.llm.analyze_trade(llm_ctx)
         if llm_result["decision"] == "skip" and llm_result["confidence"] >= 85:
             logger.info(f"[{symbol}] LLM says SKIP ({llm_result['confidence']}%): {llm_result['reasoning']}")
@@ -431,14 +459,14 @@ class OrderFlowBot:
                 "cvd_strength": cvd_trend["strength"],
                 "signals": [s.description for s in detected_signals],
                 "biases": {
-                    "derivatives": deriv_bias.get("bias", 0),
+                    "derivatives": deriv_bias.bias,
                     "sentiment": sent_bias,
-                    "multi-TF": htf_data.get("bias", 0),
+                    "multi-TF": htf_bias,
                     "AI predict": ai_bias,
                     "orderbook": ob_bias,
                     "sweep": sweep_bias,
-                    "vol profile": vp_data.get("bias", 0),
-                    "learner": learner_data.get("bias", 0),
+                    "vol profile": vp_data.bias,
+                    "learner": learner_data.bias,
                     "strategy hist": strat_bias,
                     "symbol hist": sym_bias,
                 },
@@ -469,7 +497,12 @@ class OrderFlowBot:
 
     async def _position_monitor(self):
         while self._running:
-            await asyncio.sleep(1)
+            # Sleep until a price moves >0.05% (or emergency close); 5s safety net
+            try:
+                await asyncio.wait_for(self._monitor_wakeup.wait(), timeout=5.0)
+            except asyncio.TimeoutError:
+                pass
+            self._monitor_wakeup.clear()
 
             if self.bot_state.get("emergency_close"):
                 positions = await self.execution.sync_positions()
@@ -479,6 +512,7 @@ class OrderFlowBot:
                         await self.execution.close_position(pos, price, "EMERGENCY_CLOSE")
                 self.bot_state["emergency_close"] = False
                 await self.telegram.notify_risk_alert("Fermeture d'urgence de toutes les positions!")
+                self.risk.invalidate_stats()
                 balance = await self.execution.get_balance()
                 await self.risk.update_balance(balance)
                 self.bot_state["balance"] = balance
@@ -487,70 +521,81 @@ class OrderFlowBot:
             open_positions = await self.execution.sync_positions()
 
             if self.config.is_paper:
+                active, prices = [], []
                 for pos in open_positions:
                     current_price = self.collector.last_price(pos.symbol)
                     if current_price <= 0:
                         continue
+                    active.append(pos)
+                    prices.append(current_price)
+
+                # Trailing stop update
+                for pos, new_sl in self.trailing.update_batch(active, prices):
+                    pos.stop_loss = new_sl
+                    await self.db.save_position(pos)
 
-                    # Trailing stop update
-                    new_sl = self.trailing.update(pos, current_price)
-                    if new_sl is not None:
-                        pos.stop_loss = new_sl
-                        await self.db.save_position(pos)
-
-                    effective_sl = self.trailing.get_effective_sl(pos)
-                    from models import Side
-                    should_close = False
-                    reason = ""
-                    if pos.side == Side.BUY:
-                        if current_price <= effective_sl:
-                            should_close, reason = True, "Stop-loss hit"
-                        elif current_price >= pos.take_profit:
-                            should_close, reason = True, "Take-profit hit"
-                    else:
-                        if current_price >= effective_sl:
-                            should_close, reason = True, "Stop-loss hit"
-                        elif current_price <= pos.take_profit:
-                            should_close, reason = True, "Take-profit hit"
-
-                    if should_close:
-                        pnl = pos.calculate_pnl(current_price)
-                        pnl_pct = pos.calculate_pnl_pct(current_price)
-                        await self.execution.close_position(pos, current_price, reason)
-                        self.trailing.remove(pos.id)
-
-                        self.kill_switch.record_trade_result(pnl)
-                        self.dynamic_sizer.record_trade(pnl)
-
-                        trade_ctx = self.bot_state.get("_trade_contexts", {}).pop(pos.id, {})
-                        original_signals = trade_ctx.get("original_signals", [])
-                        self.learner.record_trade(pos.symbol, pos.strategy.value, original_signals, pnl > 0, pnl)
-
-                        balance = await self.execution.get_balance()
-                        await self.risk.update_balance(balance)
-                        self.bot_state["balance"] = balance
-
-                        today_stats = await self.db.get_today_stats()
-                        open_time = trade_ctx.get("open_time", time.time())
-                        duration_s = int(time.time() - open_time)
-                        dm, ds = divmod(duration_s, 60)
-                        dh, dm = divmod(dm, 60)
-                        duration_str = f"{dh}h {dm}m" if dh else f"{dm}m {ds}s"
-
-                        close_context = {
-                            **trade_ctx,
-                            "balance": balance,
-                            "daily_pnl": today_stats.total_pnl,
-                            "duration": duration_str,
-                        }
-
-                        await self.telegram.notify_trade_close(
-                            pos.symbol, pos.side.value, pos.entry_price,
-                            current_price, pnl, pnl_pct, reason, close_context,
-                        )
+                for pos, current_price, reason, pnl in self._check_sl_tp(active, prices):
+                    await self._close_paper_position(pos, current_price, reason, pnl)
             else:
                 await self._sync_live_positions(open_positions)
 
+    def _check_sl_tp(self, positions: list, prices: list) -> list:
+        """SL/TP sweep over all open positions (trailing-aware). Returns (pos, price, reason, pnl) to close."""
+        sls = [self.trailing.get_effective_sl(p) for p in positions]
+        closes = self.risk.sweep_closes(positions, prices, sls)
+        if not closes:
+            return []
+
+        price_of = {id(p): x for p, x in zip(positions, prices)}
+        closing = [p for p, _ in closes]
+        px = np.fromiter((price_of[id(p)] for p in closing), dtype=np.float64, count=len(closing))
+        entries = np.fromiter((p.entry_price for p in closing), dtype=np.float64, count=len(closing))
+        sizes = np.fromiter((p.size for p in closing), dtype=np.float64, count=len(closing))
+        pnls = pnl_batch(entries, sizes, side_signs(closing), px).tolist()
+
+        return [
+            (pos, price, reason, pnl)
+            for (pos, reason), price, pnl in zip(closes, px.tolist(), pnls)
+        ]
+
+    async def _close_paper_position(self, pos: Position, current_price: float, reason: str,
+                                    pnl: Optional[float] = None):
+        if pnl is None:
+            pnl = pos.calculate_pnl(current_price)
+        pnl_pct = pos.calculate_pnl_pct(current_price)
+        await self.execution.close_position(pos, current_price, reason)
+        self.risk.invalidate_stats()
+
+        self.kill_switch.record_trade_result(pnl)
+        self.dynamic_sizer.record_trade(pnl)
+
+        trade_ctx = self.bot_state.get("_trade_contexts", {}).pop(pos.id, {})
+        original_signals = trade_ctx.get("original_signals", [])
+        await self.learner.record_trade(pos.symbol, pos.strategy.value, original_signals, pnl > 0, pnl)
+
+        balance = await self.execution.get_balance()
+        await self.risk.update_balance(balance)
+        self.bot_state["balance"] = balance
+
+        today_stats = await self.db.get_today_stats()
+        open_time = trade_ctx.get("open_time", time.time())
+        duration_s = int(time.time() - open_time)
+        dm, ds = divmod(duration_s, 60)
+        dh, dm = divmod(dm, 60)
+        duration_str = f"{dh}h {dm}m" if dh else f"{dm}m {ds}s"
+
+        close_context = {
+            **trade_ctx,
+            "balance": balance,
+            "daily_pnl": today_stats.total_pnl,
+            "duration": duration_str,
+        }
+
+        await self.telegram.notify_trade_close(
+            pos.symbol, pos.side.value, pos.entry_price,
+            current_price, pnl, pnl_pct, reason, close_context,
+        )
+
     async def _sync_live_positions(self, db_positions: list):
         if not self.execution.exchange:
             return
@@ -569,7 +614,7 @@ class OrderFlowBot:
                     pnl = pos.calculate_pnl(price)
                     pnl_pct = pos.calculate_pnl_pct(price)
                     await self.db.close_position(pos.id, price, pnl, pnl_pct)
-                    self.trailing.remove(pos.id)
+                    self.risk.invalidate_stats()
                     await self.telegram.notify_trade_close(
                         pos.symbol, pos.side.value, pos.entry_price, price, pnl, pnl_pct, "Exchange SL/TP"
                     )
@@ -588,33 +633,42 @@ class OrderFlowBot:
             minutes, seconds = divmod(remainder, 60)
 
             total_ticks = self.collector.total_ticks
-            total_candles = sum(p.candle_count for p in self.pipelines.values())
             first_sym = self.config.symbol_list[0] if self.config.symbol_list else ""
-            first_pipe = self.pipelines.get(first_sym)
+            first_cvd = first_delta = 0
 
             for symbol, pipeline in self.pipelines.items():
+                fp = pipeline.footprint
+                lc = fp.last_candle
+                cvd_r = round(fp.cumulative_delta, 4)
+                ld_r = round(lc.delta, 4) if lc else 0
+                if symbol == first_sym:
+                    first_cvd, first_delta = cvd_r, ld_r
+
                 self.bot_state["markets"][symbol] = {
                     "last_price": self.collector.last_price(symbol),
                     "ticks": self.collector.tick_count(symbol),
                     "candles": pipeline.candle_count,
-                    "delta": round(pipeline.footprint.last_candle.delta, 4) if pipeline.footprint.last_candle else 0,
-                    "cvd": round(pipeline.footprint.cumulative_delta, 4),
+                    "delta": ld_r,
+                    "cvd": cvd_r,
                 }
                 self.bot_state["regimes"][symbol] = pipeline.regime.current_regime.value
                 self.bot_state["derivatives"][symbol] = self.derivatives.get_data(symbol)
                 self.bot_state["sentiment"][symbol] = self.sentiment.get_data(symbol)
 
-                candles = pipeline.footprint.get_last_n_candles(10)
+                candles = fp.get_last_n_candles(10)
                 pred = pipeline.predictor.predict(candles)
                 self.bot_state["ai_predictions"][symbol] = pred
 
+                self.bot_state["orderbook"][symbol] = self.orderbook.get_analysis(symbol)
+                self.bot_state["volume_profiles"][symbol] = pipeline.volume_profile.get_analysis()
+
             self.bot_state.update({
                 "running": self._running,
                 "last_price": self.collector.last_price(first_sym),
                 "tick_count": total_ticks,
-                "candles_count": total_candles,
-                "cvd": round(first_pipe.footprint.cumulative_delta, 4) if first_pipe else 0,
-                "last_delta": round(first_pipe.footprint.last_candle.delta, 4) if first_pipe and first_pipe.footprint.last_candle else 0,
+                "candles_count": self._total_candles,
+                "cvd": first_cvd,
+                "last_delta": first_delta,
                 "uptime": f"{hours}h {minutes}m {seconds}s",
                 "health": self.health.get_status(),
                 "correlations": self.correlation.get_all_correlations(),
@@ -623,10 +677,6 @@ class OrderFlowBot:
                 "dynamic_sizing": self.dynamic_sizer.get_risk_multiplier(),
             })
 
-            for symbol, pipe in self.pipelines.items():
-                self.bot_state["orderbook"][symbol] = self.orderbook.get_analysis(symbol)
-                self.bot_state["volume_profiles"][symbol] = pipe.volume_profile.get_analysis()
-
             self.bot_state["learner"] = self.learner.get_summary()
             self.bot_state["llm_calls"] = self.llm._call_count
 
@@ -656,4 +706,9 @@ class OrderFlowBot:
 
 if __name__ == "__main__":
     bot = OrderFlowBot()
-    asyncio.run(bot.start())
+    try:
+        import uvloop
+    except ImportError:  # Windows or uvloop not installed — default asyncio loop
+        asyncio.run(bot.start())
+    else:
+        uvloop.run(bot.start())
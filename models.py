@@ -1,5 +1,7 @@
 from __future__ import annotations
+import numpy as np
 from pydantic import BaseModel, Field
+from dataclasses import dataclass, field
 from enum import Enum
 from datetime import datetime
 from typing import Optional, Dict, List
@@ -39,12 +41,19 @@ class StrategyType(str, Enum):
 
 # --- Raw data ---
 
-class RawTick(BaseModel):
+@dataclass(slots=True)
+class RawTick:
+    """Plain slotted record: built once per trade, so no validation."""
     timestamp: int
     price: float
     quantity: float
     is_buyer_maker: bool  # true = seller aggressor, false = buyer aggressor
 
+    @classmethod
+    def from_binance(cls, data: dict) -> RawTick:
+        """Build from a Binance aggTrade payload."""
+        return cls(int(data["T"]), float(data["p"]), float(data["q"]), bool(data["m"]))
+
     @property
     def is_buy(self) -> bool:
         return not self.is_buyer_maker
@@ -56,7 +65,8 @@ class RawTick(BaseModel):
 
 # --- Footprint data ---
 
-class FootprintLevel(BaseModel):
+@dataclass(slots=True)
+class FootprintLevel:
     price: float
     bid_volume: float = 0.0
     ask_volume: float = 0.0
@@ -90,17 +100,100 @@ class ValueArea(BaseModel):
     volume_at_poc: float
 
 
-class FootprintCandle(BaseModel):
+LEVEL_CAPACITY = 64  # initial per-candle price-level capacity, doubled on demand
+
+
+@dataclass(slots=True, eq=False)
+class FootprintCandle:
+    """Per-tick hot path and never serialized, so a slotted dataclass rather than a model."""
     timestamp: int
     open: float = 0.0
     high: float = 0.0
     low: float = float("inf")
     close: float = 0.0
-    levels: Dict[float, FootprintLevel] = Field(default_factory=dict)
     total_bid: float = 0.0
     total_ask: float = 0.0
     total_trades: int = 0
 
+    # Per-level volumes as parallel arrays (SoA)
+    _prices: np.ndarray = field(default_factory=lambda: np.zeros(LEVEL_CAPACITY), init=False, repr=False)
+    _bid: np.ndarray = field(default_factory=lambda: np.zeros(LEVEL_CAPACITY), init=False, repr=False)
+    _ask: np.ndarray = field(default_factory=lambda: np.zeros(LEVEL_CAPACITY), init=False, repr=False)
+    _trades: np.ndarray = field(
+        default_factory=lambda: np.zeros(LEVEL_CAPACITY, dtype=np.int64), init=False, repr=False,
+    )
+    _n: int = field(default=0, init=False, repr=False)
+    _index: Dict[float, int] = field(default_factory=dict, init=False, repr=False)
+    # Running POC (earliest-created level wins ties, same as argmax)
+    _poc_idx: int = field(default=-1, init=False, repr=False)
+    _poc_volume: float = field(default=0.0, init=False, repr=False)
+    # get_value_area results keyed by pct, valid while _va_gen matches the update count
+    _va_gen: int = field(default=0, init=False, repr=False)
+    _va_cache: Dict[float, tuple] = field(default_factory=dict, init=False, repr=False)
+
+    def update_level(self, price: float, bid_add: float, ask_add: float, trades: int = 1):
+        """Add volume at a (pre-rounded) price level, creating the level if needed."""
+        idx = self._index.get(price)
+        if idx is None:
+            idx = self._n
+            if idx == self._prices.shape[0]:
+                self._grow()
+            self._prices[idx] = price
+            self._index[price] = idx
+            self._n = idx + 1
+        self._bid[idx] += bid_add
+        self._ask[idx] += ask_add
+        self._trades[idx] += trades
+        self._va_gen += 1
+
+        tv = self._bid[idx] + self._ask[idx]
+        if self._poc_idx < 0 or tv > self._poc_volume or (tv == self._poc_volume and idx < self._poc_idx):
+            self._poc_idx = idx
+            self._poc_volume = tv
+
+    def _grow(self):
+        cap = self._prices.shape[0] * 2
+        for name in ("_prices", "_bid", "_ask", "_trades"):
+            old = getattr(self, name)
+            new = np.zeros(cap, dtype=old.dtype)
+            new[:old.shape[0]] = old
+            setattr(self, name, new)
+
+    @property
+    def level_count(self) -> int:
+        return self._n
+
+    @property
+    def price_array(self) -> np.ndarray:
+        return self._prices[:self._n]
+
+    @property
+    def bid_array(self) -> np.ndarray:
+        return self._bid[:self._n]
+
+    @property
+    def ask_array(self) -> np.ndarray:
+        return self._ask[:self._n]
+
+    @property
+    def trade_array(self) -> np.ndarray:
+        return self._trades[:self._n]
+
+    @property
+    def volume_array(self) -> np.ndarray:
+        return self._bid[:self._n] + self._ask[:self._n]
+
+    @property
+    def levels(self) -> Dict[float, FootprintLevel]:
+        """Per-level view built on demand (insertion order). Prefer the array accessors."""
+        return {
+            p: FootprintLevel(price=p, bid_volume=b, ask_volume=a, trades=t)
+            for p, b, a, t in zip(
+                self.price_array.tolist(), self.bid_array.tolist(),
+                self.ask_array.tolist(), self.trade_array.tolist(),
+            )
+        }
+
     @property
     def delta(self) -> float:
         return self.total_ask - self.total_bid
@@ -111,31 +204,35 @@ class FootprintCandle(BaseModel):
 
     @property
     def poc(self) -> float:
-        if not self.levels:
+        if self._poc_idx < 0:
             return self.close
-        return max(self.levels.values(), key=lambda l: l.total_volume).price
+        return float(self._prices[self._poc_idx])
 
     def get_value_area(self, pct: float = 0.70) -> ValueArea:
-        if not self.levels:
+        cached = self._va_cache.get(pct)
+        if cached is not None and cached[0] == self._va_gen and cached[1] == self.close:
+            return cached[2]
+        va = self._compute_value_area(pct)
+        self._va_cache[pct] = (self._va_gen, self.close, va)
+        return va
+
+    def _compute_value_area(self, pct: float) -> ValueArea:
+        n = self._n
+        if n == 0:
             return ValueArea(high=self.close, low=self.close, poc=self.close, volume_at_poc=0)
 
-        sorted_levels = sorted(self.levels.values(), key=lambda l: l.total_volume, reverse=True)
-        poc_level = sorted_levels[0]
-        target_volume = self.total_volume * pct
-        accumulated = poc_level.total_volume
-        included_prices = [poc_level.price]
-
-        for level in sorted_levels[1:]:
-            if accumulated >= target_volume:
-                break
-            accumulated += level.total_volume
-            included_prices.append(level.price)
+        tv = self.volume_array
+        order = np.argsort(-tv, kind="stable")
+        cum = np.cumsum(tv[order])
+        k = min(int(np.searchsorted(cum, self.total_volume * pct)) + 1, n)
+        included = self._prices[order[:k]]
+        poc_idx = order[0]
 
         return ValueArea(
-            high=max(included_prices),
-            low=min(included_prices),
-            poc=poc_level.price,
-            volume_at_poc=poc_level.total_volume,
+            high=float(included.max()),
+            low=float(included.min()),
+            poc=float(self._prices[poc_idx]),
+            volume_at_poc=float(tv[poc_idx]),
         )
 
 
@@ -160,6 +257,14 @@ class TradeSignal(BaseModel):
     timestamp: int = Field(default_factory=lambda: int(datetime.now().timestamp() * 1000))
 
 
+@dataclass(slots=True)
+class BiasResult:
+    """Score adjustment produced by an analysis module (positive = bullish)."""
+    bias: int = 0
+    reason: str = ""
+    details: dict = field(default_factory=dict)
+
+
 # --- Positions & Trades ---
 
 class Position(BaseModel):
@@ -179,6 +284,8 @@ class Position(BaseModel):
     pnl: Optional[float] = None
     pnl_pct: Optional[float] = None
     order_ids: List[str] = Field(default_factory=list)
+    # Runtime trailing stop (not persisted: once trailed, stop_loss carries it across reloads)
+    trailing_sl: Optional[float] = Field(default=None, exclude=True)
 
     @property
     def notional_value(self) -> float:
@@ -197,6 +304,18 @@ class Position(BaseModel):
         return ((self.entry_price - current_price) / self.entry_price) * 100 * self.leverage
 
 
+def side_signs(positions: List[Position]) -> np.ndarray:
+    """+1 for longs, -1 for shorts, aligned with `positions`."""
+    return np.fromiter(
+        (1.0 if p.side == Side.BUY else -1.0 for p in positions), dtype=np.float64, count=len(positions)
+    )
+
+
+def pnl_batch(entries: np.ndarray, sizes: np.ndarray, signs: np.ndarray, prices: np.ndarray) -> np.ndarray:
+    """Vectorized Position.calculate_pnl over parallel arrays."""
+    return (prices - entries) * sizes * signs
+
+
 class DailyStats(BaseModel):
     date: str
     total_trades: int = 0
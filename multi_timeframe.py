@@ -1,6 +1,6 @@
 import logging
-from typing import Dict, List, Optional
-from models import RawTick, FootprintCandle
+from typing import Dict, List, Optional, Tuple
+from models import RawTick, FootprintCandle, BiasResult
 from footprint_engine import FootprintEngine
 from signal_detector import SignalDetector
 from config import Config
@@ -10,8 +10,9 @@ logger = logging.getLogger("mtf")
 
 class MultiTimeframeAnalyzer:
     """
-    Runs parallel footprint engines at different timeframes (1m, 5m, 15m, 1h)
-    and provides higher-timeframe confirmation for trade signals.
+    Builds footprint candles at several timeframes (1m, 5m, 15m, 1h) and
+    provides higher-timeframe confirmation for trade signals. Only the 1m
+    engine sees ticks; higher timeframes are aggregated from closed 1m candles.
     """
 
     TIMEFRAMES = [1, 5, 15, 60]
@@ -22,6 +23,11 @@ class MultiTimeframeAnalyzer:
         self.engines: Dict[int, FootprintEngine] = {}
         self.detectors: Dict[int, SignalDetector] = {}
         self.last_candles: Dict[int, Optional[FootprintCandle]] = {}
+        self._higher_tfs: Dict[int, Tuple[int, ...]] = {
+            tf: tuple(t for t in self.TIMEFRAMES if t > tf) for tf in self.TIMEFRAMES
+        }
+        # (base_tf, include_details) -> (last candle timestamps, result); only changes on a close
+        self._htf_cache: Dict[Tuple[int, bool], Tuple[Tuple[int, ...], BiasResult]] = {}
 
         for tf in self.TIMEFRAMES:
             cfg_copy = Config()
@@ -36,21 +42,41 @@ class MultiTimeframeAnalyzer:
     def process_tick(self, tick: RawTick) -> Dict[int, Optional[FootprintCandle]]:
         """Process tick across all timeframes. Returns completed candles."""
         completed = {}
-        for tf, engine in self.engines.items():
-            result = engine.process_tick(tick)
+        base_tf = self.TIMEFRAMES[0]
+        candle = self.engines[base_tf].process_tick(tick)
+        if candle is None:
+            return completed
+
+        self.last_candles[base_tf] = candle
+        completed[base_tf] = candle
+        for tf in self._higher_tfs[base_tf]:
+            engine = self.engines[tf]
+            engine.merge_candle(candle)
+            result = engine.close_if_elapsed(tick.timestamp)
             if result is not None:
                 self.last_candles[tf] = result
                 completed[tf] = result
         return completed
 
-    def get_htf_bias(self, base_tf: int = 5) -> dict:
+    def get_htf_bias(self, base_tf: int = 5, include_details: bool = True) -> BiasResult:
         """
         Check if higher timeframes confirm the direction.
-        Returns bias score and analysis.
+        Returns bias score, confirmation state (as reason) and per-TF details
+        (details left empty when include_details is False).
+        Cached until a candle closes on any timeframe.
         """
+        key = tuple(c.timestamp if c else 0 for c in self.last_candles.values())
+        cached = self._htf_cache.get((base_tf, include_details))
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        result = self._compute_htf_bias(base_tf, include_details)
+        self._htf_cache[(base_tf, include_details)] = (key, result)
+        return result
+
+    def _compute_htf_bias(self, base_tf: int, include_details: bool) -> BiasResult:
         base_candle = self.last_candles.get(base_tf)
         if not base_candle:
-            return {"bias": 0, "confirmation": "no_data", "details": {}}
+            return BiasResult(reason="no_data")
 
         base_bullish = base_candle.delta > 0 and base_candle.close > base_candle.open
 
@@ -58,34 +84,28 @@ class MultiTimeframeAnalyzer:
         contradictions = 0
         details = {}
 
-        for tf in self.TIMEFRAMES:
-            if tf <= base_tf:
-                continue
-
-            engine = self.engines[tf]
+        for tf in self._higher_tfs[base_tf]:
             candle = self.last_candles.get(tf)
             if not candle:
                 continue
 
             tf_bullish = candle.delta > 0 and candle.close > candle.open
-            cvd_trend = engine.get_cvd_trend(5)
 
-            if base_bullish and tf_bullish:
-                confirmations += 1
-            elif not base_bullish and not tf_bullish:
+            if base_bullish == tf_bullish:
                 confirmations += 1
             else:
                 contradictions += 1
 
-            details[f"{tf}m"] = {
-                "delta": round(candle.delta, 2),
-                "direction": "bull" if tf_bullish else "bear",
-                "cvd_direction": cvd_trend["direction"],
-            }
+            if include_details:
+                details[f"{tf}m"] = {
+                    "delta": round(candle.delta, 2),
+                    "direction": "bull" if tf_bullish else "bear",
+                    "cvd_direction": self.engines[tf].get_cvd_trend(5)["direction"],
+                }
 
         total = confirmations + contradictions
         if total == 0:
-            return {"bias": 0, "confirmation": "no_data", "details": details}
+            return BiasResult(reason="no_data", details=details)
 
         bias = ((confirmations - contradictions) / total) * 15
 
@@ -96,7 +116,11 @@ class MultiTimeframeAnalyzer:
         else:
             confirmation = "mixed"
 
-        return {"bias": round(bias), "confirmation": confirmation, "details": details}
+        return BiasResult(bias=round(bias), reason=confirmation, details=details)
+
+    def get_htf_bias_fast(self, base_tf: int = 5) -> int:
+        """Score-only variant of get_htf_bias (no per-TF details or CVD trends)."""
+        return self.get_htf_bias(base_tf, include_details=False).bias
 
     def get_htf_signals(self, tf: int) -> list:
         candle = self.last_candles.get(tf)
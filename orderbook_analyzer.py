@@ -1,7 +1,8 @@
 import logging
 import asyncio
-import json
+import orjson
 from typing import Dict, Optional
+import numpy as np
 import websockets
 from config import Config
 
@@ -21,6 +22,9 @@ class OrderBookAnalyzer:
         self._books: Dict[str, dict] = {}
         self._analysis: Dict[str, dict] = {}
         self._running = False
+        self._ws_to_ccxt: Dict[str, str] = {
+            Config.ccxt_to_ws(s).upper(): s for s in config.symbol_list
+        }
 
     async def start(self):
         self._running = True
@@ -48,10 +52,10 @@ class OrderBookAnalyzer:
                     logger.warning(f"Order book WS error: {e}")
                     await asyncio.sleep(5)
 
-    async def _process(self, raw: str, combined: bool):
+    async def _process(self, raw: str | bytes, combined: bool):
         try:
-            msg = json.loads(raw)
-        except json.JSONDecodeError:
+            msg = orjson.loads(raw)
+        except orjson.JSONDecodeError:
             return
 
         data = msg.get("data", msg) if combined else msg
@@ -61,27 +65,33 @@ class OrderBookAnalyzer:
             stream = msg.get("stream", "")
             symbol_ws = stream.split("@")[0].upper() if stream else ""
 
-        ccxt_sym = None
-        for sym in self.config.symbol_list:
-            if Config.ccxt_to_ws(sym).upper() == symbol_ws:
-                ccxt_sym = sym
-                break
-
+        ccxt_sym = self._ws_to_ccxt.get(symbol_ws)
         if not ccxt_sym:
             return
 
-        bids = [(float(p), float(q)) for p, q in data.get("b", data.get("bids", []))]
-        asks = [(float(p), float(q)) for p, q in data.get("a", data.get("asks", []))]
-
-        if not bids or not asks:
+        # (N, 2) price/qty arrays; Binance sends numeric strings, converted in C
+        raw_bids = data.get("b")
+        raw_asks = data.get("a")
+        if raw_bids is None:
+            raw_bids = data.get("bids", ())
+        if raw_asks is None:
+            raw_asks = data.get("asks", ())
+        bids = np.asarray(raw_bids, dtype=np.float64).reshape(-1, 2)
+        asks = np.asarray(raw_asks, dtype=np.float64).reshape(-1, 2)
+
+        if not len(bids) or not len(asks):
             return
 
         self._books[ccxt_sym] = {"bids": bids, "asks": asks}
         self._analyze(ccxt_sym, bids, asks)
 
-    def _analyze(self, symbol: str, bids: list, asks: list):
-        total_bid = sum(q for _, q in bids)
-        total_ask = sum(q for _, q in asks)
+    def _analyze(self, symbol: str, bids: np.ndarray, asks: np.ndarray):
+        # Quantities in float32 (ample for ratio tests); prices stay float64 since
+        # float32 can't resolve a 0.1 tick at BTC prices. Totals accumulate in float64.
+        bq = bids[:, 1].astype(np.float32)
+        aq = asks[:, 1].astype(np.float32)
+        total_bid = float(bq.sum(dtype=np.float64))
+        total_ask = float(aq.sum(dtype=np.float64))
         total = total_bid + total_ask
 
         if total == 0:
@@ -89,20 +99,14 @@ class OrderBookAnalyzer:
 
         imbalance = (total_bid - total_ask) / total
 
-        bid_walls = []
-        ask_walls = []
-        avg_bid = total_bid / max(len(bids), 1)
-        avg_ask = total_ask / max(len(asks), 1)
+        avg_bid = total_bid / max(bq.size, 1)
+        avg_ask = total_ask / max(aq.size, 1)
 
-        for price, qty in bids:
-            if qty > avg_bid * 4:
-                bid_walls.append({"price": price, "quantity": qty, "ratio": qty / avg_bid})
-        for price, qty in asks:
-            if qty > avg_ask * 4:
-                ask_walls.append({"price": price, "quantity": qty, "ratio": qty / avg_ask})
+        bid_walls = bids[bq > avg_bid * 4]
+        ask_walls = asks[aq > avg_ask * 4]
 
-        spread = asks[0][0] - bids[0][0] if asks and bids else 0
-        mid_price = (asks[0][0] + bids[0][0]) / 2 if asks and bids else 0
+        spread = float(asks[0, 0] - bids[0, 0])
+        mid_price = float(asks[0, 0] + bids[0, 0]) / 2
 
         self._analysis[symbol] = {
             "imbalance": round(imbalance, 4),
@@ -110,8 +114,14 @@ class OrderBookAnalyzer:
             "total_ask": round(total_ask, 2),
             "spread": round(spread, 4),
             "mid_price": round(mid_price, 2),
-            "bid_walls": bid_walls[:3],
-            "ask_walls": ask_walls[:3],
+            "bid_walls": [
+                {"price": price, "quantity": qty, "ratio": qty / avg_bid}
+                for price, qty in bid_walls[:3].tolist()
+            ],
+            "ask_walls": [
+                {"price": price, "quantity": qty, "ratio": qty / avg_ask}
+                for price, qty in ask_walls[:3].tolist()
+            ],
             "bid_wall_count": len(bid_walls),
             "ask_wall_count": len(ask_walls),
         }
@@ -1,5 +1,6 @@
 import logging
 import math
+import numpy as np
 from typing import List, Optional
 from enum import Enum
 from collections import deque
@@ -7,6 +8,12 @@ from models import FootprintCandle
 
 logger = logging.getLogger("regime")
 
+try:
+    from numba import njit
+    _HAS_NUMBA = True
+except ImportError:
+    _HAS_NUMBA = False
+
 
 class MarketRegime(str, Enum):
     TRENDING_UP = "trending_up"
@@ -25,6 +32,81 @@ REGIME_STRATEGY_MAP = {
 }
 
 
+# --- Numba kernels (optional — NumPy implementations below are the fallback) ---
+
+if _HAS_NUMBA:
+    @njit(cache=True, fastmath=True)
+    def _volatility_nb(closes):
+        n = closes.shape[0]
+        total = 0.0
+        count = 0
+        for i in range(1, n):
+            prev = closes[i - 1]
+            if prev > 0:
+                total += (closes[i] - prev) / prev
+                count += 1
+        if count == 0:
+            return 0.0
+        inv_n = 1.0 / count
+        mean = total * inv_n
+        var = 0.0
+        for i in range(1, n):
+            prev = closes[i - 1]
+            if prev > 0:
+                d = (closes[i] - prev) / prev - mean
+                var += d * d
+        return math.sqrt(var * inv_n)
+
+    @njit(cache=True, fastmath=True)
+    def _trend_nb(closes):
+        n = closes.shape[0]
+        if n < 5:
+            return 0.0
+        inv_n = 1.0 / n
+        x_mean = (n - 1) * 0.5
+        y_sum = 0.0
+        for i in range(n):
+            y_sum += closes[i]
+        y_mean = y_sum * inv_n
+        num = 0.0
+        den = 0.0
+        for i in range(n):
+            dx = i - x_mean
+            num += dx * (closes[i] - y_mean)
+            den += dx * dx
+        if den == 0.0 or y_mean == 0.0:
+            return 0.0
+        return num / den / y_mean
+
+    @njit(cache=True, fastmath=True)
+    def _vol_health_nb(vols):
+        n = vols.shape[0]
+        if n < 3:
+            return 1.0
+        total = 0.0
+        for i in range(n):
+            total += vols[i]
+        avg = total / n
+        if avg <= 0:
+            return 1.0
+        return (vols[n - 1] + vols[n - 2] + vols[n - 3]) / 3.0 / avg
+
+
+_kernels_warm = False
+
+
+def _warm_kernels():
+    """Compile (or load from cache) the Numba kernels once, before the first candle."""
+    global _kernels_warm
+    if _kernels_warm or not _HAS_NUMBA:
+        return
+    dummy = np.ones(5, dtype=np.float64)
+    _volatility_nb(dummy)
+    _trend_nb(dummy)
+    _vol_health_nb(dummy)
+    _kernels_warm = True
+
+
 class RegimeDetector:
     """
     Detects the current market regime using volatility, trend strength,
@@ -35,16 +117,20 @@ class RegimeDetector:
         self.lookback = lookback
         self._regimes: deque = deque(maxlen=100)
         self.current_regime: MarketRegime = MarketRegime.RANGING
+        _warm_kernels()
 
     def analyze(self, candles: List[FootprintCandle]) -> MarketRegime:
         if len(candles) < 5:
             return MarketRegime.RANGING
 
         recent = candles[-min(self.lookback, len(candles)):]
+        n = len(recent)
+        closes = np.fromiter((c.close for c in recent), dtype=np.float64, count=n)
+        volumes = np.fromiter((c.total_volume for c in recent), dtype=np.float64, count=n)
 
-        volatility = self._calc_volatility(recent)
-        trend = self._calc_trend_strength(recent)
-        volume_health = self._calc_volume_health(recent)
+        volatility = self._calc_volatility(closes)
+        trend = self._calc_trend_strength(closes)
+        volume_health = self._calc_volume_health(volumes)
 
         regime = self._classify(volatility, trend, volume_health, recent)
         self.current_regime = regime
@@ -56,43 +142,43 @@ class RegimeDetector:
         )
         return regime
 
-    def _calc_volatility(self, candles: List[FootprintCandle]) -> float:
-        if len(candles) < 2:
+    def _calc_volatility(self, closes: np.ndarray) -> float:
+        if _HAS_NUMBA:
+            return float(_volatility_nb(closes))
+        if closes.size < 2:
             return 0.0
-        returns = []
-        for i in range(1, len(candles)):
-            if candles[i - 1].close > 0:
-                r = (candles[i].close - candles[i - 1].close) / candles[i - 1].close
-                returns.append(r)
-        if not returns:
+        prev = closes[:-1]
+        valid = prev > 0
+        if not valid.any():
             return 0.0
-        mean = sum(returns) / len(returns)
-        variance = sum((r - mean) ** 2 for r in returns) / len(returns)
-        return math.sqrt(variance)
+        returns = np.diff(closes)[valid] / prev[valid]
+        return float(returns.std())
 
-    def _calc_trend_strength(self, candles: List[FootprintCandle]) -> float:
+    def _calc_trend_strength(self, closes: np.ndarray) -> float:
         """Positive = uptrend, negative = downtrend, near 0 = no trend."""
-        if len(candles) < 5:
+        if _HAS_NUMBA:
+            return float(_trend_nb(closes))
+        n = closes.size
+        if n < 5:
             return 0.0
 
-        closes = [c.close for c in candles]
-        n = len(closes)
-        x_mean = (n - 1) / 2
-        y_mean = sum(closes) / n
-        numerator = sum((i - x_mean) * (closes[i] - y_mean) for i in range(n))
-        denominator = sum((i - x_mean) ** 2 for i in range(n))
+        x = np.arange(n, dtype=np.float64)
+        x -= x.mean()
+        y_mean = closes.mean()
+        denominator = (x * x).sum()
         if denominator == 0:
             return 0.0
-        slope = numerator / denominator
-        return slope / y_mean if y_mean != 0 else 0.0
+        slope = (x * (closes - y_mean)).sum() / denominator
+        return float(slope / y_mean) if y_mean != 0 else 0.0
 
-    def _calc_volume_health(self, candles: List[FootprintCandle]) -> float:
-        if len(candles) < 3:
+    def _calc_volume_health(self, volumes: np.ndarray) -> float:
+        if _HAS_NUMBA:
+            return float(_vol_health_nb(volumes))
+        if volumes.size < 3:
             return 1.0
-        volumes = [c.total_volume for c in candles]
-        avg_vol = sum(volumes) / len(volumes)
-        recent_avg = sum(volumes[-3:]) / 3
-        return recent_avg / avg_vol if avg_vol > 0 else 1.0
+        avg_vol = volumes.mean()
+        recent_avg = volumes[-3:].mean()
+        return float(recent_avg / avg_vol) if avg_vol > 0 else 1.0
 
     def _classify(self, volatility: float, trend: float, vol_health: float,
                   candles: List[FootprintCandle]) -> MarketRegime:
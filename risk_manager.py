@@ -1,6 +1,10 @@
+import asyncio
 import logging
-from typing import List
-from models import TradeSignal, Position, Side
+import time
+from datetime import date
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+from models import TradeSignal, Position, Side, DailyStats, side_signs
 from database import DatabaseManager
 from config import Config
 
@@ -17,6 +21,8 @@ class RiskManager:
         self.config = config
         self.db = database
         self.account_balance: float = 0.0
+        # (date, monotonic fetch time, stats) — today's stats reused for a few seconds
+        self._stats_cache: Optional[Tuple[str, float, DailyStats]] = None
 
     async def update_balance(self, balance: float):
         self.account_balance = balance
@@ -27,15 +33,16 @@ class RiskManager:
         """
         Returns {"approved": True/False, "size": float, "reason": str}
         """
-        checks = [
+        # Run concurrently so the DB-backed check overlaps the in-memory ones;
+        # results come back in order, so the first rejection reported is unchanged
+        results = await asyncio.gather(
             self._check_daily_loss_limit(),
             self._check_max_positions(open_positions),
             self._check_same_direction(signal, open_positions, symbol),
             self._check_balance(),
-        ]
+        )
 
-        for check_coro in checks:
-            result = await check_coro
+        for result in results:
             if not result["approved"]:
                 logger.warning(f"TRADE REJECTED: {result['reason']}")
                 return result
@@ -50,8 +57,22 @@ class RiskManager:
         )
         return {"approved": True, "size": size, "reason": "All checks passed"}
 
-    async def _check_daily_loss_limit(self) -> dict:
+    def invalidate_stats(self):
+        """Drop cached daily stats; call after a position is closed."""
+        self._stats_cache = None
+
+    async def _get_today_stats(self) -> DailyStats:
+        today = date.today().isoformat()
+        now = time.monotonic()
+        cached = self._stats_cache
+        if cached and cached[0] == today and now - cached[1] < 5.0:
+            return cached[2]
         stats = await self.db.get_today_stats()
+        self._stats_cache = (today, now, stats)
+        return stats
+
+    async def _check_daily_loss_limit(self) -> dict:
+        stats = await self._get_today_stats()
         max_loss = self.account_balance * (self.config.max_daily_loss_pct / 100)
 
         if abs(stats.total_pnl) >= max_loss and stats.total_pnl < 0:
@@ -134,3 +155,29 @@ class RiskManager:
                 return {"close": True, "reason": "Take-profit hit"}
 
         return {"close": False, "reason": ""}
+
+    def sweep_closes(self, positions: List[Position], prices: Sequence[float],
+                     stop_losses: Optional[Sequence[float]] = None) -> List[Tuple[Position, str]]:
+        """
+        Vectorized should_close_position over a portfolio. `stop_losses` overrides
+        each position's stop (e.g. trailing). Returns (position, reason) to close.
+        """
+        n = len(positions)
+        if n == 0:
+            return []
+        px = np.asarray(prices, dtype=np.float64)
+        sign = side_signs(positions)
+        if stop_losses is None:
+            sl = np.fromiter((p.stop_loss for p in positions), dtype=np.float64, count=n)
+        else:
+            sl = np.asarray(stop_losses, dtype=np.float64)
+        tp = np.fromiter((p.take_profit for p in positions), dtype=np.float64, count=n)
+
+        # Branchless for both sides: a long's SL is below price, a short's above
+        sl_hit = sign * (px - sl) <= 0
+        tp_hit = sign * (tp - px) <= 0
+
+        return [
+            (positions[i], "Stop-loss hit" if sl_hit[i] else "Take-profit hit")
+            for i in np.flatnonzero(sl_hit | tp_hit).tolist()
+        ]
@@ -1,6 +1,7 @@
 import logging
 import asyncio
 import aiohttp
+import orjson
 import re
 from typing import Dict, Optional
 from config import Config
@@ -20,6 +21,12 @@ BEARISH_WORDS = {
     "drop", "loss", "risk", "warning", "concern", "investigation", "vulnerability",
 }
 
+# One compiled alternation over both keyword sets: a single scan per article that
+# only surfaces keyword hits (same whole-word semantics as \w+ tokenization)
+_KEYWORD_RE = re.compile(
+    r"\b(?:" + "|".join(sorted(BULLISH_WORDS | BEARISH_WORDS, key=len, reverse=True)) + r")\b"
+)
+
 
 class SentimentAnalyzer:
     """
@@ -47,31 +54,32 @@ class SentimentAnalyzer:
             async with self._session.get(CRYPTO_NEWS_URL, timeout=aiohttp.ClientTimeout(total=15)) as r:
                 if r.status != 200:
                     return
-                data = await r.json()
+                data = orjson.loads(await r.read())
 
             articles = data.get("Data", [])[:20]
             symbol_mentions = {}
+            coins = [(symbol, symbol.split("/")[0]) for symbol in self.config.symbol_list]
+            coins_lower = [(coin, coin.lower()) for _, coin in coins]
 
             for article in articles:
                 title = article.get("title", "").lower()
                 body = article.get("body", "").lower()[:500]
                 text = title + " " + body
                 categories = article.get("categories", "").upper()
-
-                for symbol in self.config.symbol_list:
-                    coin = symbol.split("/")[0]
-                    if coin.lower() in text or coin in categories:
-                        if coin not in symbol_mentions:
-                            symbol_mentions[coin] = []
-                        score = self._score_text(text)
-                        symbol_mentions[coin].append({
-                            "title": article.get("title", ""),
-                            "score": score,
-                            "source": article.get("source", ""),
-                        })
-
-            for symbol in self.config.symbol_list:
-                coin = symbol.split("/")[0]
+                mention = None
+
+                for coin, coin_lower in coins_lower:
+                    if coin_lower in text or coin in categories:
+                        if mention is None:
+                            # Score once per article, shared by every coin it mentions
+                            mention = {
+                                "title": article.get("title", ""),
+                                "score": self._score_text(text),
+                                "source": article.get("source", ""),
+                            }
+                        symbol_mentions.setdefault(coin, []).append(mention)
+
+            for symbol, coin in coins:
                 mentions = symbol_mentions.get(coin, [])
                 if mentions:
                     avg_score = sum(m["score"] for m in mentions) / len(mentions)
@@ -88,9 +96,9 @@ class SentimentAnalyzer:
             logger.warning(f"Sentiment fetch error: {e}")
 
     def _score_text(self, text: str) -> float:
-        words = set(re.findall(r'\w+', text.lower()))
-        bull_count = len(words & BULLISH_WORDS)
-        bear_count = len(words & BEARISH_WORDS)
+        found = set(_KEYWORD_RE.findall(text.lower()))
+        bull_count = sum(1 for w in found if w in BULLISH_WORDS)
+        bear_count = len(found) - bull_count
         total = bull_count + bear_count
         if total == 0:
             return 0.0
@@ -125,6 +133,52 @@ class SentimentAnalyzer:
             logger.debug(f"AI sentiment error: {e}")
         return None
 
+    async def get_ai_sentiment_batch(self, symbol_headlines: Dict[str, list]) -> Dict[str, float]:
+        """Score several symbols with one OpenAI call; falls back to per-symbol calls."""
+        if not self.openai_key or not symbol_headlines:
+            return {}
+        coins = {symbol.split("/")[0]: symbol for symbol in symbol_headlines}
+        scores: Dict[str, float] = {}
+        try:
+            prompt = (
+                "Rate the overall crypto market sentiment for each coin below based on its "
+                "headlines, on a scale from -1.0 (very bearish) to +1.0 (very bullish). "
+                "Return ONLY a JSON object mapping coin -> number.\n\n" +
+                "\n\n".join(
+                    f"{coin}:\n" + "\n".join(f"- {h}" for h in symbol_headlines[symbol][:10])
+                    for coin, symbol in coins.items()
+                )
+            )
+            async with self._session.post(
+                "https://api.openai.com/v1/chat/completions",
+                headers={"Authorization": f"Bearer {self.openai_key}"},
+                json={
+                    "model": "gpt-4o-mini",
+                    "messages": [{"role": "user", "content": prompt}],
+                    "max_tokens": 10 * len(coins) + 10,
+                    "response_format": {"type": "json_object"},
+                },
+                timeout=aiohttp.ClientTimeout(total=15),
+            ) as r:
+                if r.status == 200:
+                    data = orjson.loads(await r.read())
+                    result = orjson.loads(data["choices"][0]["message"]["content"])
+                    for coin, symbol in coins.items():
+                        if coin in result:
+                            scores[symbol] = float(result[coin])
+        except Exception as e:
+            logger.debug(f"AI batch sentiment error: {e}")
+
+        missing = [symbol for symbol in symbol_headlines if symbol not in scores]
+        if missing:
+            results = await asyncio.gather(
+                *(self.get_ai_sentiment(symbol, symbol_headlines[symbol]) for symbol in missing)
+            )
+            for symbol, score in zip(missing, results):
+                if score is not None:
+                    scores[symbol] = score
+        return scores
+
     def get_data(self, symbol: str) -> dict:
         return self._cache.get(symbol, {"score": 0, "mentions": 0, "label": "neutral"})
 
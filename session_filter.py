@@ -1,5 +1,7 @@
 import logging
-from datetime import datetime, timezone
+import time
+from functools import lru_cache
+from typing import Dict, Tuple
 
 logger = logging.getLogger("session")
 
@@ -38,24 +40,50 @@ class SessionFilter:
     def __init__(self, block_weekends: bool = False, block_low_quality: bool = False):
         self.block_weekends = block_weekends
         self.block_low_quality = block_low_quality
-
-    def get_current_session(self) -> dict:
-        now = datetime.now(timezone.utc)
-        hour = now.hour
-        weekday = now.weekday()
-        is_weekend = weekday >= 5
-
+        # hour -> (session, quality, multiplier); weekend override applied on lookup
+        self._hour_table: Tuple[Tuple[str, str, float], ...] = tuple(
+            self._lookup_hour(hour) for hour in range(24)
+        )
+        self._session_cache: Dict[Tuple[int, int], dict] = {}
+        # (hour, weekday) only changes on minute boundaries; re-derive at most once a minute
+        self._last_minute = -1
+        self._last_slot: Tuple[int, int] = (0, 0)
+
+    def _now_slot(self) -> Tuple[int, int]:
+        minute = int(time.time() // 60)
+        if minute != self._last_minute:
+            t = time.gmtime(minute * 60)
+            self._last_slot = (t.tm_hour, t.tm_wday)
+            self._last_minute = minute
+        return self._last_slot
+
+    def _lookup_hour(self, hour: int) -> Tuple[str, str, float]:
         session_name = "unknown"
         quality = "medium"
-
         for name, info in self.SESSIONS.items():
             if info["start"] <= hour < info["end"]:
                 session_name = name
                 quality = info["quality"]
                 break
+        return session_name, quality, self.QUALITY_MULTIPLIERS.get(quality, 0.7)
 
+    def get_current_session(self) -> dict:
+        return self._session_for(*self._now_slot())
+
+    def _session_for(self, hour: int, weekday: int) -> dict:
+        key = (hour, weekday)
+        session = self._session_cache.get(key)
+        if session is None:
+            session = self._build_session(hour, weekday)
+            self._session_cache[key] = session
+        return session
+
+    def _build_session(self, hour: int, weekday: int) -> dict:
+        session_name, quality, multiplier = self._hour_table[hour]
+        is_weekend = weekday >= 5
         if is_weekend:
             quality = "low"
+            multiplier = self.QUALITY_MULTIPLIERS["low"]
 
         return {
             "session": session_name,
@@ -63,11 +91,16 @@ class SessionFilter:
             "hour_utc": hour,
             "weekday": weekday,
             "is_weekend": is_weekend,
-            "size_multiplier": self.QUALITY_MULTIPLIERS.get(quality, 0.7),
+            "size_multiplier": multiplier,
         }
 
     def should_trade(self) -> dict:
-        session = self.get_current_session()
+        return self._decide(*self._now_slot())
+
+    @lru_cache(maxsize=256)
+    def _decide(self, hour: int, weekday: int) -> dict:
+        """Pure decision for a (UTC hour, weekday) slot; result is shared, don't mutate."""
+        session = self._session_for(hour, weekday)
 
         if self.block_weekends and session["is_weekend"]:
             return {
@@ -1,5 +1,5 @@
 import logging
-from typing import List
+from typing import List, Optional
 from models import (
     FootprintCandle, OrderFlowSignal, SignalType,
 )
@@ -8,6 +8,10 @@ from footprint_engine import FootprintEngine
 logger = logging.getLogger("signals")
 
 
+def _clamp100(x: float) -> float:
+    return x if x < 100 else 100
+
+
 class SignalDetector:
     """Analyzes footprint data to detect actionable order flow signals."""
 
@@ -16,17 +20,28 @@ class SignalDetector:
 
     def analyze(self, candle: FootprintCandle) -> List[OrderFlowSignal]:
         """Run all detectors on a completed candle and return signals."""
+        if candle.total_volume <= self.fp.min_candle_volume:
+            return []
+
         signals: List[OrderFlowSignal] = []
 
-        signals.extend(self._detect_stacked_imbalances(candle))
-        signals.extend(self._detect_delta_divergence(candle))
+        # Previous closed candle, shared by the divergence and POC detectors
+        recent = self.fp.recent_candles()
+        prev = recent[-2] if len(recent) >= 2 else None
+
+        # A stack needs stacked_min levels each holding imbalance_volume
+        if candle.total_volume >= self.fp.imbalance_volume * self.fp.stacked_min:
+            signals.extend(self._detect_stacked_imbalances(candle))
+        signals.extend(self._detect_delta_divergence(candle, prev))
         signals.extend(self._detect_absorption(candle))
         signals.extend(self._detect_exhaustion())
         signals.extend(self._detect_cvd_confirmation(candle))
-        signals.extend(self._detect_poc_magnet(candle))
+        signals.extend(self._detect_poc_magnet(candle, prev))
 
-        for s in signals:
-            logger.info(f"SIGNAL: {s.type.value} | strength={s.strength:.0f} | price={s.price} | {s.description}")
+        if signals and logger.isEnabledFor(logging.INFO):
+            for s in signals:
+                logger.info("SIGNAL: %s | strength=%.0f | price=%s | %s",
+                            s.type.value, s.strength, s.price, s.description)
 
         return signals
 
@@ -38,7 +53,7 @@ class SignalDetector:
         signals = []
 
         for stack in stacks["buy"]:
-            strength = min(len(stack) * 20 + 20, 100)
+            strength = _clamp100(len(stack) * 20 + 20)
             signals.append(OrderFlowSignal(
                 type=SignalType.STACKED_IMBALANCE_BUY,
                 strength=strength,
@@ -48,7 +63,7 @@ class SignalDetector:
             ))
 
         for stack in stacks["sell"]:
-            strength = min(len(stack) * 20 + 20, 100)
+            strength = _clamp100(len(stack) * 20 + 20)
             signals.append(OrderFlowSignal(
                 type=SignalType.STACKED_IMBALANCE_SELL,
                 strength=strength,
@@ -62,40 +77,41 @@ class SignalDetector:
     # ------------------------------------------------------------------
     # 2. Delta divergence
     # ------------------------------------------------------------------
-    def _detect_delta_divergence(self, candle: FootprintCandle) -> List[OrderFlowSignal]:
-        prev_candles = self.fp.get_last_n_candles(3)
-        if len(prev_candles) < 2:
+    def _detect_delta_divergence(self, candle: FootprintCandle,
+                                 prev: Optional[FootprintCandle]) -> List[OrderFlowSignal]:
+        if prev is None:
             return []
 
-        prev = prev_candles[-2]
-        signals = []
+        close = candle.close
+        delta = candle.delta
+        prev_delta = prev.delta
+
+        price_up = close > prev.close and candle.high > prev.high
+        price_down = close < prev.close and candle.low < prev.low
+        delta_negative = delta < 0 and delta < prev_delta
+        delta_positive = delta > 0 and delta > prev_delta
+
+        if not ((price_up and delta_negative) or (price_down and delta_positive)):
+            return []
 
-        price_up = candle.close > prev.close and candle.high > prev.high
-        price_down = candle.close < prev.close and candle.low < prev.low
-        delta_negative = candle.delta < 0 and candle.delta < prev.delta
-        delta_positive = candle.delta > 0 and candle.delta > prev.delta
+        div_strength = _clamp100(abs(delta) / max(candle.total_volume, 1) * 200)
 
         if price_up and delta_negative:
-            div_strength = min(abs(candle.delta) / max(candle.total_volume, 1) * 200, 100)
-            signals.append(OrderFlowSignal(
+            return [OrderFlowSignal(
                 type=SignalType.DELTA_DIVERGENCE_BEAR,
                 strength=div_strength,
-                price=candle.close,
-                timestamp=candle.timestamp,
-                description=f"Price up but delta falling ({candle.delta:+.2f}) — hidden selling",
-            ))
-
-        if price_down and delta_positive:
-            div_strength = min(abs(candle.delta) / max(candle.total_volume, 1) * 200, 100)
-            signals.append(OrderFlowSignal(
-                type=SignalType.DELTA_DIVERGENCE_BULL,
-                strength=div_strength,
-                price=candle.close,
+                price=close,
                 timestamp=candle.timestamp,
-                description=f"Price down but delta rising ({candle.delta:+.2f}) — hidden buying",
-            ))
+                description=f"Price up but delta falling ({delta:+.2f}) — hidden selling",
+            )]
 
-        return signals
+        return [OrderFlowSignal(
+            type=SignalType.DELTA_DIVERGENCE_BULL,
+            strength=div_strength,
+            price=close,
+            timestamp=candle.timestamp,
+            description=f"Price down but delta rising ({delta:+.2f}) — hidden buying",
+        )]
 
     # ------------------------------------------------------------------
     # 3. Absorption
@@ -105,7 +121,7 @@ class SignalDetector:
         signals = []
 
         for zone in absorption["support"]:
-            strength = min(zone["strength"] * 25, 100)
+            strength = _clamp100(zone["strength"] * 25)
             signals.append(OrderFlowSignal(
                 type=SignalType.ABSORPTION_SUPPORT,
                 strength=strength,
@@ -115,7 +131,7 @@ class SignalDetector:
             ))
 
         for zone in absorption["resistance"]:
-            strength = min(zone["strength"] * 25, 100)
+            strength = _clamp100(zone["strength"] * 25)
             signals.append(OrderFlowSignal(
                 type=SignalType.ABSORPTION_RESISTANCE,
                 strength=strength,
@@ -188,12 +204,11 @@ class SignalDetector:
     # ------------------------------------------------------------------
     # 6. POC magnet
     # ------------------------------------------------------------------
-    def _detect_poc_magnet(self, candle: FootprintCandle) -> List[OrderFlowSignal]:
-        prev_candles = self.fp.get_last_n_candles(5)
-        if len(prev_candles) < 2:
+    def _detect_poc_magnet(self, candle: FootprintCandle,
+                           prev: Optional[FootprintCandle]) -> List[OrderFlowSignal]:
+        if prev is None:
             return []
 
-        prev = prev_candles[-2]
         prev_va = prev.get_value_area()
         price = candle.close
         poc = prev_va.poc
@@ -203,28 +218,26 @@ class SignalDetector:
 
         distance_pct = abs(price - poc) / poc * 100
 
-        if distance_pct < 0.05:
+        if distance_pct <= 0.3:
             return []
 
-        signals = []
+        strength = distance_pct * 100
+        if strength > 80:
+            strength = 80
 
-        if distance_pct > 0.3 and price < poc:
-            strength = min(distance_pct * 100, 80)
-            signals.append(OrderFlowSignal(
+        if price < poc:
+            return [OrderFlowSignal(
                 type=SignalType.POC_MAGNET_LONG,
                 strength=strength,
                 price=price,
                 timestamp=candle.timestamp,
                 description=f"Price {distance_pct:.2f}% below prev POC ({poc:.2f}) — magnet pull up",
-            ))
-        elif distance_pct > 0.3 and price > poc:
-            strength = min(distance_pct * 100, 80)
-            signals.append(OrderFlowSignal(
-                type=SignalType.POC_MAGNET_SHORT,
-                strength=strength,
-                price=price,
-                timestamp=candle.timestamp,
-                description=f"Price {distance_pct:.2f}% above prev POC ({poc:.2f}) — magnet pull down",
-            ))
+            )]
 
-        return signals
+        return [OrderFlowSignal(
+            type=SignalType.POC_MAGNET_SHORT,
+            strength=strength,
+            price=price,
+            timestamp=candle.timestamp,
+            description=f"Price {distance_pct:.2f}% above prev POC ({poc:.2f}) — magnet pull down",
+        )]
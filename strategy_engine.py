@@ -1,4 +1,5 @@
 import logging
+import numpy as np
 from typing import Optional, List, Set, Tuple
 from models import (
     FootprintCandle, OrderFlowSignal, SignalType,
@@ -9,6 +10,12 @@ from config import Config
 
 logger = logging.getLogger("strategy")
 
+try:
+    from numba import njit
+    _HAS_NUMBA = True
+except ImportError:
+    _HAS_NUMBA = False
+
 BULLISH_SIGNALS = {
     SignalType.STACKED_IMBALANCE_BUY,
     SignalType.DELTA_DIVERGENCE_BULL,
@@ -42,6 +49,89 @@ SIGNAL_WEIGHTS = {
     SignalType.POC_MAGNET_SHORT: 0.7,
 }
 
+# One bit per signal type, so a set of seen types is a single int
+_BIT = {t: 1 << i for i, t in enumerate(SignalType)}
+
+# Per-type (weight, bit, is_bull, is_bear): one lookup per signal on the hot path
+_TRAITS = {
+    t: (SIGNAL_WEIGHTS.get(t, 1.0), _BIT[t], t in BULLISH_SIGNALS, t in BEARISH_SIGNALS)
+    for t in SignalType
+}
+
+# Category masks for _classify_strategy
+_ABSORPTION_MASK = _BIT[SignalType.ABSORPTION_SUPPORT] | _BIT[SignalType.ABSORPTION_RESISTANCE]
+_DIVERGENCE_MASK = _BIT[SignalType.DELTA_DIVERGENCE_BULL] | _BIT[SignalType.DELTA_DIVERGENCE_BEAR]
+_EXHAUSTION_MASK = _BIT[SignalType.EXHAUSTION_BULL] | _BIT[SignalType.EXHAUSTION_BEAR]
+_IMBALANCE_MASK = _BIT[SignalType.STACKED_IMBALANCE_BUY] | _BIT[SignalType.STACKED_IMBALANCE_SELL]
+_CVD_MASK = _BIT[SignalType.CVD_CONFIRMS_UP] | _BIT[SignalType.CVD_CONFIRMS_DOWN]
+_POC_MASK = _BIT[SignalType.POC_MAGNET_LONG] | _BIT[SignalType.POC_MAGNET_SHORT]
+_REVERSAL_MASK = _ABSORPTION_MASK | _DIVERGENCE_MASK | _EXHAUSTION_MASK
+
+_MAX_SINGLE_SCORE = 100.0 * max(SIGNAL_WEIGHTS.values())
+# Bonus by number of distinct confirming types: +12 per extra type, capped at 30
+_CONFLUENCE_BONUS = tuple(min(max(n - 1, 0) * 12, 30) for n in range(len(SignalType) + 1))
+
+
+# SoA encoding for array scoring: dense type ids index these per-type tables
+_TYPE_ID = {t: i for i, t in enumerate(SignalType)}
+_WEIGHT_ARR = np.array([SIGNAL_WEIGHTS.get(t, 1.0) for t in SignalType], dtype=np.float64)
+_BULL_ARR = np.array([t in BULLISH_SIGNALS for t in SignalType], dtype=np.bool_)
+_BEAR_ARR = np.array([t in BEARISH_SIGNALS for t in SignalType], dtype=np.bool_)
+_BONUS_ARR = np.array(_CONFLUENCE_BONUS, dtype=np.float64)
+
+
+# --- Numba kernel (optional — NumPy implementation below is the fallback) ---
+
+if _HAS_NUMBA:
+    @njit(cache=True)
+    def _score_kernel(type_ids, strengths, valid, weights, max_single, bonus):
+        count = 0
+        seen = 0
+        weighted_sum = 0.0
+        for i in range(type_ids.shape[0]):
+            t = type_ids[i]
+            if valid[t]:
+                count += 1
+                seen |= 1 << t
+                weighted_sum += strengths[i] * weights[t]
+        if count < 2:
+            return 0.0
+        unique_types = 0
+        while seen:
+            seen &= seen - 1
+            unique_types += 1
+        if unique_types < 2:
+            return 0.0
+        score = (weighted_sum / count / max_single) * 70 + bonus[unique_types]
+        return min(score, 100.0)
+
+
+def _score_numpy(type_ids, strengths, valid, weights, max_single, bonus) -> float:
+    sel = valid[type_ids]
+    count = int(sel.sum())
+    if count < 2:
+        return 0.0
+    ids = type_ids[sel]
+    unique_types = int(np.count_nonzero(np.bincount(ids, minlength=weights.size)))
+    if unique_types < 2:
+        return 0.0
+    weighted_sum = float((strengths[sel] * weights[ids]).sum())
+    score = (weighted_sum / count / max_single) * 70 + bonus[unique_types]
+    return min(score, 100.0)
+
+
+_kernels_warm = False
+
+
+def _warm_kernels():
+    """Compile (or load from cache) the Numba kernel once, before the first evaluation."""
+    global _kernels_warm
+    if _kernels_warm or not _HAS_NUMBA:
+        return
+    _score_kernel(np.zeros(2, dtype=np.int64), np.ones(2, dtype=np.float64),
+                  _BULL_ARR, _WEIGHT_ARR, _MAX_SINGLE_SCORE, _BONUS_ARR)
+    _kernels_warm = True
+
 
 class StrategyEngine:
     """Combines order flow signals into trade decisions with SL/TP levels."""
@@ -50,49 +140,113 @@ class StrategyEngine:
         self.config = config
         self.fp = footprint
         self.min_score = config.min_confluence_score
+        _warm_kernels()
 
     def evaluate(self, candle: FootprintCandle, signals: List[OrderFlowSignal]) -> Optional[TradeSignal]:
         if not signals:
             return None
 
-        bull_score = self._compute_directional_score(signals, BULLISH_SIGNALS)
-        bear_score = self._compute_directional_score(signals, BEARISH_SIGNALS)
+        bull_signals, bear_signals, bull_score, bear_score = self._partition_and_score(signals)
 
         logger.info(f"Confluence scores — BULL: {bull_score:.1f} | BEAR: {bear_score:.1f} | min: {self.min_score}")
 
         if bull_score >= self.min_score and bull_score > bear_score:
-            return self._build_long_signal(candle, signals, bull_score)
+            return self._build_long_signal(candle, signals, bull_score, bull_signals)
 
         if bear_score >= self.min_score and bear_score > bull_score:
-            return self._build_short_signal(candle, signals, bear_score)
+            return self._build_short_signal(candle, signals, bear_score, bear_signals)
 
         return None
 
-    def _compute_directional_score(self, signals: List[OrderFlowSignal], valid_types: set) -> float:
-        relevant = [s for s in signals if s.type in valid_types]
-        if len(relevant) < 2:
+    def _partition_and_score(self, signals: List[OrderFlowSignal]
+                             ) -> Tuple[List[OrderFlowSignal], List[OrderFlowSignal], float, float]:
+        """One pass: split signals into bull/bear lists and accumulate both scores."""
+        bull, bear = [], []
+        bull_seen = bear_seen = 0
+        bull_sum = bear_sum = 0.0
+        for s in signals:
+            weight, bit, is_bull, is_bear = _TRAITS[s.type]
+            if is_bull:
+                bull.append(s)
+                bull_seen |= bit
+                bull_sum += s.strength * weight
+            elif is_bear:
+                bear.append(s)
+                bear_seen |= bit
+                bear_sum += s.strength * weight
+
+        return (
+            bull, bear,
+            self._directional_score(len(bull), bull_seen, bull_sum),
+            self._directional_score(len(bear), bear_seen, bear_sum),
+        )
+
+    @staticmethod
+    def signal_arrays(signals: List[OrderFlowSignal]) -> Tuple[np.ndarray, np.ndarray]:
+        """Encode signals as (type_ids, strengths) arrays for score_arrays."""
+        n = len(signals)
+        type_ids = np.fromiter((_TYPE_ID[s.type] for s in signals), dtype=np.int64, count=n)
+        strengths = np.fromiter((s.strength for s in signals), dtype=np.float64, count=n)
+        return type_ids, strengths
+
+    @staticmethod
+    def score_arrays(type_ids: np.ndarray, strengths: np.ndarray) -> Tuple[float, float]:
+        """
+        (bull, bear) confluence scores for array-encoded signals — same result as
+        _partition_and_score, for callers batching signals outside the per-candle path.
+        """
+        score = _score_kernel if _HAS_NUMBA else _score_numpy
+        return (
+            float(score(type_ids, strengths, _BULL_ARR, _WEIGHT_ARR, _MAX_SINGLE_SCORE, _BONUS_ARR)),
+            float(score(type_ids, strengths, _BEAR_ARR, _WEIGHT_ARR, _MAX_SINGLE_SCORE, _BONUS_ARR)),
+        )
+
+    @staticmethod
+    def score_batch(signal_lists: List[List[OrderFlowSignal]]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (bull, bear) confluence score vectors for several symbols' signals at once,
+        scored in one vectorised pass over the concatenated signals.
+        """
+        m = len(signal_lists)
+        counts = np.fromiter((len(sigs) for sigs in signal_lists), dtype=np.int64, count=m)
+        flat = [s for sigs in signal_lists for s in sigs]
+        type_ids, strengths = StrategyEngine.signal_arrays(flat)
+        seg = np.repeat(np.arange(m), counts)
+
+        weighted = strengths * _WEIGHT_ARR[type_ids]
+        present = np.zeros((m, _WEIGHT_ARR.size), dtype=np.bool_)
+        present[seg, type_ids] = True
+
+        def directional(valid: np.ndarray) -> np.ndarray:
+            sel = valid[type_ids]
+            count = np.bincount(seg, weights=sel, minlength=m)
+            weighted_sum = np.bincount(seg, weights=np.where(sel, weighted, 0.0), minlength=m)
+            unique_types = (present & valid).sum(axis=1)
+            ok = (count >= 2) & (unique_types >= 2)
+            base = np.divide(weighted_sum, count, out=np.zeros(m), where=ok) / _MAX_SINGLE_SCORE * 70
+            return np.where(ok, np.minimum(base + _BONUS_ARR[unique_types], 100.0), 0.0)
+
+        return directional(_BULL_ARR), directional(_BEAR_ARR)
+
+    @staticmethod
+    def _directional_score(count: int, seen: int, weighted_sum: float) -> float:
+        if count < 2:
             return 0.0
 
-        unique_types = len({s.type for s in relevant})
+        unique_types = seen.bit_count()
         if unique_types < 2:
             return 0.0
 
-        weighted_sum = sum(s.strength * SIGNAL_WEIGHTS.get(s.type, 1.0) for s in relevant)
-        avg_weighted = weighted_sum / len(relevant)
-        max_single = 100 * max(SIGNAL_WEIGHTS.values())
-
-        base_score = (avg_weighted / max_single) * 70
-
-        confluence_bonus = min((unique_types - 1) * 12, 30)
-        score = base_score + confluence_bonus
+        avg_weighted = weighted_sum / count
+        base_score = (avg_weighted / _MAX_SINGLE_SCORE) * 70
+        score = base_score + _CONFLUENCE_BONUS[unique_types]
 
         return min(score, 100)
 
     def _build_long_signal(self, candle: FootprintCandle, signals: List[OrderFlowSignal],
-                           score: float) -> TradeSignal:
+                           score: float, bull_signals: List[OrderFlowSignal]) -> TradeSignal:
         strategy = self._classify_strategy(signals, Side.BUY)
         sl, tp = self._compute_sl_tp(candle, Side.BUY, strategy)
-        bull_signals = [s for s in signals if s.type in BULLISH_SIGNALS]
 
         trade = TradeSignal(
             side=Side.BUY,
@@ -110,10 +264,9 @@ class StrategyEngine:
         return trade
 
     def _build_short_signal(self, candle: FootprintCandle, signals: List[OrderFlowSignal],
-                            score: float) -> TradeSignal:
+                            score: float, bear_signals: List[OrderFlowSignal]) -> TradeSignal:
         strategy = self._classify_strategy(signals, Side.SELL)
         sl, tp = self._compute_sl_tp(candle, Side.SELL, strategy)
-        bear_signals = [s for s in signals if s.type in BEARISH_SIGNALS]
 
         trade = TradeSignal(
             side=Side.SELL,
@@ -131,28 +284,16 @@ class StrategyEngine:
         return trade
 
     def _classify_strategy(self, signals: List[OrderFlowSignal], side: Side) -> StrategyType:
-        types = {s.type for s in signals}
+        seen = 0
+        for s in signals:
+            seen |= _BIT[s.type]
 
-        has_absorption = (
-            SignalType.ABSORPTION_SUPPORT in types or SignalType.ABSORPTION_RESISTANCE in types
-        )
-        has_divergence = (
-            SignalType.DELTA_DIVERGENCE_BULL in types or SignalType.DELTA_DIVERGENCE_BEAR in types
-        )
-        has_exhaustion = (
-            SignalType.EXHAUSTION_BULL in types or SignalType.EXHAUSTION_BEAR in types
-        )
-        has_imbalance = (
-            SignalType.STACKED_IMBALANCE_BUY in types or SignalType.STACKED_IMBALANCE_SELL in types
-        )
-        has_cvd = (
-            SignalType.CVD_CONFIRMS_UP in types or SignalType.CVD_CONFIRMS_DOWN in types
-        )
-        has_poc = (
-            SignalType.POC_MAGNET_LONG in types or SignalType.POC_MAGNET_SHORT in types
-        )
+        has_imbalance = bool(seen & _IMBALANCE_MASK)
+        has_cvd = bool(seen & _CVD_MASK)
+        has_poc = bool(seen & _POC_MASK)
 
-        if has_absorption or has_divergence or has_exhaustion:
+        # Absorption, divergence or exhaustion
+        if seen & _REVERSAL_MASK:
             return StrategyType.REVERSAL
         # Imbalance + another confirming signal = reversal (not pure breakout)
         if has_imbalance and (has_cvd or has_poc):
@@ -167,11 +308,8 @@ class StrategyEngine:
                        strategy: StrategyType) -> Tuple[float, float]:
         va = candle.get_value_area()
 
-        recent = self.fp.get_last_n_candles(10)
-        if len(recent) >= 3:
-            ranges = [c.high - c.low for c in recent if c.high - c.low > 0]
-            atr_proxy = sum(ranges) / len(ranges) if ranges else candle.close * 0.002
-        else:
+        atr_proxy = self.fp.atr_proxy()
+        if atr_proxy is None:
             atr_proxy = candle.high - candle.low
         if atr_proxy == 0:
             atr_proxy = candle.close * 0.002
@@ -6,6 +6,54 @@ from config import Config
 
 logger = logging.getLogger("telegram")
 
+_SEP = "━━━━━━━━━━━━━━━━━━\n"
+
+_STRAT_FR = {"reversal": "Retournement", "breakout": "Cassure", "poc_reversion": "Retour au POC"}
+_REGIME_FR = {
+    "ranging": "Range (lateral)", "trending_up": "Tendance haussiere",
+    "trending_down": "Tendance baissiere", "volatile": "Volatile", "low_volume": "Faible volume",
+}
+_CVD_FR = {"up": "haussier", "down": "baissier", "neutral": "neutre"}
+_SENT_FR = {"bullish": "haussier", "bearish": "baissier", "neutral": "neutre"}
+_REASON_FR = {
+    "Stop-loss hit": "Stop-Loss touche",
+    "Take-profit hit": "Take-Profit atteint",
+    "EMERGENCY_CLOSE": "Fermeture d'urgence",
+    "Exchange SL/TP": "Ferme par l'exchange",
+}
+
+_TRADE_OPEN_TMPL = (
+    "{icon} *TRADE OUVERT* `{symbol}`\n"
+    + _SEP
+    + "Direction: *{side_fr}* | Strategie: *{strat_fr}*\n"
+    "Entree: `${entry:,.2f}`\n"
+    "Stop-Loss: `${sl:,.2f}` | Take-Profit: `${tp:,.2f}`\n"
+    "Taille: `{size:.6f}` | Risque/Recompense: `1:{risk_reward:.1f}`\n"
+    + _SEP
+    + "*Pourquoi ce trade:*\n"
+    "Score de confluence: *{score:.0f}/100*\n"
+    "Regime de marche: {regime_fr}\n"
+    "CVD: {cvd_fr} (force {cvd_strength:.0f})\n"
+)
+
+_TRADE_CLOSE_TMPL = (
+    "{icon} *TRADE {outcome}* `{symbol}`\n"
+    + _SEP
+    + "Direction: *{side_fr}* | Strategie: *{strat_fr}*\n"
+    "Entree: `${entry:,.2f}` → Sortie: `${exit_price:,.2f}`\n"
+    "Resultat: *${pnl:+,.2f}* ({pnl_pct:+.2f}%)\n"
+    "Raison de fermeture: *{reason_fr}*\n"
+    "Duree: {duration}\n"
+    + _SEP
+)
+
+_MARKET_CTX_TMPL = (
+    "\n*Contexte du marche:*\n"
+    "  Taux de financement: {funding_pct:.4f}%\n"
+    "  Ratio Long/Short: {long_short_ratio:.2f}\n"
+    "  Sentiment des news: {sent_fr}\n"
+)
+
 
 class TelegramNotifier:
     """Envoie des alertes detaillees en francais sur Telegram."""
@@ -16,6 +64,10 @@ class TelegramNotifier:
         self.enabled = bool(self.bot_token and self.chat_id)
         self._session: Optional[aiohttp.ClientSession] = None
         self._queue: asyncio.Queue = asyncio.Queue()
+        self._url = f"https://api.telegram.org/bot{self.bot_token}/sendMessage"
+        self._timeout = aiohttp.ClientTimeout(total=10)
+        # Reused by the single sender loop; text/flags are overwritten per send
+        self._payload: Dict = {"chat_id": self.chat_id}
 
         if not self.enabled:
             logger.info("Telegram notifications disabled (no token/chat_id)")
@@ -23,7 +75,9 @@ class TelegramNotifier:
     async def start(self):
         if not self.enabled:
             return
-        self._session = aiohttp.ClientSession()
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=4, keepalive_timeout=60),
+        )
         await self.send(
             "*OrderFlow Trading Bot v3.0*\n"
             "Bot demarre avec succes.\n"
@@ -31,9 +85,26 @@ class TelegramNotifier:
             "Surveillance des marches en cours..."
         )
         logger.info("Telegram notifier active")
+        pending = None
         while True:
-            msg = await self._queue.get()
-            await self._do_send(msg)
+            text, silent = pending or await self._queue.get()
+            pending = None
+
+            # Coalesce messages already queued (e.g. a burst of signals) into one send
+            parts = [text]
+            size = len(text)
+            while len(parts) < 10:
+                try:
+                    nxt = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                if nxt[1] != silent or size + len(nxt[0]) + 2 > 3800:
+                    pending = nxt
+                    break
+                parts.append(nxt[0])
+                size += len(nxt[0]) + 2
+
+            await self._do_send(("\n\n".join(parts), silent))
 
     async def send(self, text: str, silent: bool = False):
         if not self.enabled:
@@ -42,21 +113,22 @@ class TelegramNotifier:
 
     async def _do_send(self, item):
         text, silent = item
-        url = f"https://api.telegram.org/bot{self.bot_token}/sendMessage"
         if len(text) > 4000:
             text = text[:4000] + "\n..."
 
+        payload = self._payload
+        payload["disable_notification"] = silent
+
         # Try Markdown first, fallback to plain text if it fails
         for parse_mode in ["Markdown", None]:
-            payload = {
-                "chat_id": self.chat_id,
-                "text": text if parse_mode else text.replace("*", "").replace("`", "").replace("_", ""),
-                "disable_notification": silent,
-            }
             if parse_mode:
+                payload["text"] = text
                 payload["parse_mode"] = parse_mode
+            else:
+                payload["text"] = text.replace("*", "").replace("`", "").replace("_", "")
+                payload.pop("parse_mode", None)
             try:
-                async with self._session.post(url, json=payload, timeout=aiohttp.ClientTimeout(total=10)) as r:
+                async with self._session.post(self._url, json=payload, timeout=self._timeout) as r:
                     if r.status == 200:
                         return
                     if parse_mode:
@@ -72,74 +144,59 @@ class TelegramNotifier:
     async def notify_trade_open(self, symbol: str, side: str, size: float,
                                 entry: float, sl: float, tp: float, strategy: str,
                                 context: Dict = None):
+        if not self.enabled:
+            return
         icon = "📈" if side == "buy" else "📉"
         side_fr = "ACHAT" if side == "buy" else "VENTE"
         ctx = context or {}
 
-        signals_text = ""
-        for sig in ctx.get("signals", []):
-            signals_text += f"  - {sig}\n"
-
-        biases_text = ""
-        for name, val in ctx.get("biases", {}).items():
-            if val != 0:
-                biases_text += f"  {name}: {val:+d}\n"
-
-        llm_text = ""
-        llm = ctx.get("llm")
-        if llm and llm.get("reasoning"):
-            llm_text = f"\n*Analyse IA:* {llm['reasoning']}"
-
         risk_reward = abs(tp - entry) / abs(entry - sl) if abs(entry - sl) > 0 else 0
 
-        strat_fr = {"reversal": "Retournement", "breakout": "Cassure", "poc_reversion": "Retour au POC"}.get(strategy, strategy)
-        regime_fr = {
-            "ranging": "Range (lateral)", "trending_up": "Tendance haussiere",
-            "trending_down": "Tendance baissiere", "volatile": "Volatile", "low_volume": "Faible volume"
-        }.get(ctx.get("regime", ""), ctx.get("regime", "?"))
+        strat_fr = _STRAT_FR.get(strategy, strategy)
+        regime = ctx.get("regime", "?")
+        regime_fr = _REGIME_FR.get(regime, regime)
 
         cvd_dir = ctx.get("cvd_direction", "?")
-        cvd_fr = {"up": "haussier", "down": "baissier", "neutral": "neutre"}.get(cvd_dir, cvd_dir)
-
-        msg = (
-            f"{icon} *TRADE OUVERT* `{symbol}`\n"
-            f"━━━━━━━━━━━━━━━━━━\n"
-            f"Direction: *{side_fr}* | Strategie: *{strat_fr}*\n"
-            f"Entree: `${entry:,.2f}`\n"
-            f"Stop-Loss: `${sl:,.2f}` | Take-Profit: `${tp:,.2f}`\n"
-            f"Taille: `{size:.6f}` | Risque/Recompense: `1:{risk_reward:.1f}`\n"
-            f"━━━━━━━━━━━━━━━━━━\n"
-            f"*Pourquoi ce trade:*\n"
-            f"Score de confluence: *{ctx.get('score', 0):.0f}/100*\n"
-            f"Regime de marche: {regime_fr}\n"
-            f"CVD: {cvd_fr} (force {ctx.get('cvd_strength', 0):.0f})\n"
-        )
+        cvd_fr = _CVD_FR.get(cvd_dir, cvd_dir)
 
-        if signals_text:
-            msg += f"\n*Signaux detectes:*\n{signals_text}"
+        parts = [_TRADE_OPEN_TMPL.format_map({
+            "icon": icon, "symbol": symbol, "side_fr": side_fr, "strat_fr": strat_fr,
+            "entry": entry, "sl": sl, "tp": tp, "size": size, "risk_reward": risk_reward,
+            "score": ctx.get("score", 0), "regime_fr": regime_fr,
+            "cvd_fr": cvd_fr, "cvd_strength": ctx.get("cvd_strength", 0),
+        })]
 
-        if biases_text:
-            msg += f"\n*Ajustements du score:*\n{biases_text}"
+        signals = ctx.get("signals", [])
+        if signals:
+            parts.append("\n*Signaux detectes:*\n")
+            parts.extend(f"  - {sig}\n" for sig in signals)
+
+        biases = [f"  {name}: {val:+d}\n" for name, val in ctx.get("biases", {}).items() if val != 0]
+        if biases:
+            parts.append("\n*Ajustements du score:*\n")
+            parts.extend(biases)
 
         derivatives = ctx.get("derivatives", {})
         if derivatives:
             sent = ctx.get("sentiment", "?")
-            sent_fr = {"bullish": "haussier", "bearish": "baissier", "neutral": "neutre"}.get(sent, sent)
-            msg += (
-                f"\n*Contexte du marche:*\n"
-                f"  Taux de financement: {derivatives.get('funding_rate', 0)*100:.4f}%\n"
-                f"  Ratio Long/Short: {derivatives.get('long_short_ratio', 0):.2f}\n"
-                f"  Sentiment des news: {sent_fr}\n"
-            )
+            sent_fr = _SENT_FR.get(sent, sent)
+            parts.append(_MARKET_CTX_TMPL.format_map({
+                "funding_pct": derivatives.get("funding_rate", 0) * 100,
+                "long_short_ratio": derivatives.get("long_short_ratio", 0),
+                "sent_fr": sent_fr,
+            }))
 
-        if llm_text:
-            msg += llm_text
+        llm = ctx.get("llm")
+        if llm and llm.get("reasoning"):
+            parts.append(f"\n*Analyse IA:* {llm['reasoning']}")
 
-        await self.send(msg)
+        await self.send("".join(parts))
 
     async def notify_trade_close(self, symbol: str, side: str, entry: float,
                                  exit_price: float, pnl: float, pnl_pct: float,
                                  reason: str, context: Dict = None):
+        if not self.enabled:
+            return
         won = pnl > 0
         icon = "✅" if won else "❌"
         side_fr = "ACHAT" if side == "buy" else "VENTE"
@@ -147,61 +204,51 @@ class TelegramNotifier:
 
         duration = ctx.get("duration", "?")
         strat = ctx.get("strategy", "?")
-        strat_fr = {"reversal": "Retournement", "breakout": "Cassure", "poc_reversion": "Retour au POC"}.get(strat, strat)
-
-        reason_fr = {
-            "Stop-loss hit": "Stop-Loss touche",
-            "Take-profit hit": "Take-Profit atteint",
-            "EMERGENCY_CLOSE": "Fermeture d'urgence",
-            "Exchange SL/TP": "Ferme par l'exchange",
-        }.get(reason, reason)
-
-        msg = (
-            f"{icon} *TRADE {'GAGNANT' if won else 'PERDANT'}* `{symbol}`\n"
-            f"━━━━━━━━━━━━━━━━━━\n"
-            f"Direction: *{side_fr}* | Strategie: *{strat_fr}*\n"
-            f"Entree: `${entry:,.2f}` → Sortie: `${exit_price:,.2f}`\n"
-            f"Resultat: *${pnl:+,.2f}* ({pnl_pct:+.2f}%)\n"
-            f"Raison de fermeture: *{reason_fr}*\n"
-            f"Duree: {duration}\n"
-            f"━━━━━━━━━━━━━━━━━━\n"
-        )
+        strat_fr = _STRAT_FR.get(strat, strat)
+        reason_fr = _REASON_FR.get(reason, reason)
+
+        parts = [_TRADE_CLOSE_TMPL.format_map({
+            "icon": icon, "outcome": "GAGNANT" if won else "PERDANT", "symbol": symbol,
+            "side_fr": side_fr, "strat_fr": strat_fr, "entry": entry, "exit_price": exit_price,
+            "pnl": pnl, "pnl_pct": pnl_pct, "reason_fr": reason_fr, "duration": duration,
+        })]
 
         if won:
-            msg += (
+            parts.append(
                 f"*Pourquoi ca a marche:*\n"
                 f"  Les signaux de {strat_fr.lower()} etaient corrects.\n"
                 f"  Le prix a bouge de ${abs(exit_price - entry):,.2f} en notre faveur.\n"
             )
             if "Take-profit" in reason:
-                msg += f"  L'objectif de profit a ete atteint.\n"
+                parts.append("  L'objectif de profit a ete atteint.\n")
             elif "trailing" in reason.lower():
-                msg += f"  Le trailing stop a securise les profits.\n"
+                parts.append("  Le trailing stop a securise les profits.\n")
         else:
-            msg += f"*Pourquoi ca a echoue:*\n"
+            parts.append("*Pourquoi ca a echoue:*\n")
 
             if "Stop-loss" in reason:
-                msg += f"  Le prix s'est retourne contre nous et a touche le SL.\n"
+                parts.append("  Le prix s'est retourne contre nous et a touche le SL.\n")
 
             original_signals = ctx.get("original_signals", [])
             if original_signals:
-                sigs_str = ", ".join(original_signals[:3])
-                msg += f"  Signaux a l'entree: {sigs_str}\n"
+                parts.append(f"  Signaux a l'entree: {', '.join(original_signals[:3])}\n")
 
-            msg += f"  Les conditions du marche ont probablement change apres l'entree.\n"
+            parts.append("  Les conditions du marche ont probablement change apres l'entree.\n")
 
         balance = ctx.get("balance", 0)
         if balance:
-            msg += f"\n*Solde:* ${balance:,.2f}"
+            parts.append(f"\n*Solde:* ${balance:,.2f}")
 
         daily_pnl = ctx.get("daily_pnl")
         if daily_pnl is not None:
-            msg += f" | *PnL du jour:* ${daily_pnl:+,.2f}"
+            parts.append(f" | *PnL du jour:* ${daily_pnl:+,.2f}")
 
-        await self.send(msg)
+        await self.send("".join(parts))
 
     async def notify_signal(self, symbol: str, signal_type: str, strength: float,
                             price: float, description: str):
+        if not self.enabled:
+            return
         icon = "🟢" if "buy" in signal_type or "bull" in signal_type or "support" in signal_type else "🔴"
         await self.send(
             f"{icon} *Signal* `{symbol}`\n"
@@ -211,12 +258,18 @@ class TelegramNotifier:
         )
 
     async def notify_risk_alert(self, message: str):
+        if not self.enabled:
+            return
         await self.send(f"⚠️ *ALERTE RISQUE*\n{message}")
 
     async def notify_daily_report(self, report: str):
+        if not self.enabled:
+            return
         await self.send(f"📊 *Rapport Journalier*\n{report}")
 
     async def notify_health(self, message: str):
+        if not self.enabled:
+            return
         await self.send(f"🔧 *Alerte Systeme*\n{message}")
 
     async def close(self):
@@ -1,13 +1,212 @@
 import logging
 import json
-from typing import Dict, List, Tuple
+import numpy as np
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 from collections import defaultdict
 from database import DatabaseManager
+from models import BiasResult
 
 logger = logging.getLogger("learner")
 
+try:
+    from numba import njit
+    _HAS_NUMBA = True
+except ImportError:
+    _HAS_NUMBA = False
+
 MIN_SAMPLES = 5
 
+# Win-rate bands as threshold tables: band = bisect_left(loss bounds) + bisect_right(win bounds),
+# i.e. the loss bounds are inclusive (wr <= b) and the win bounds inclusive from below (wr >= b)
+_COMBO_LOSS_BOUNDS = (0.35, 0.45)
+_COMBO_WIN_BOUNDS = (0.55, 0.65)
+_COMBO_BIAS = (-15, -8, 0, 5, 10)
+
+# Combo bias reasons are returned as codes (details["reason_code"]) and only formatted on
+# display via format_combo_reason; the code for a win-rate band is REASON_WEAK + band
+REASON_NO_DATA, REASON_WEAK, REASON_BELOW_AVERAGE, REASON_NEUTRAL, REASON_GOOD, REASON_STRONG = range(6)
+REASON_TEMPLATES = {
+    REASON_NO_DATA: "Not enough data",
+    REASON_WEAK: "Weak combo: {wr:.0f}% WR over {trades} trades",
+    REASON_BELOW_AVERAGE: "Below average: {wr:.0f}% WR over {trades} trades",
+    REASON_NEUTRAL: "Neutral: {wr:.0f}% WR over {trades} trades",
+    REASON_GOOD: "Good combo: {wr:.0f}% WR over {trades} trades",
+    REASON_STRONG: "Strong combo: {wr:.0f}% WR over {trades} trades",
+}
+
+_STRATEGY_LOSS_BOUNDS = (0.35,)
+_STRATEGY_WIN_BOUNDS = (0.60,)
+_STRATEGY_BIAS = (-10, 0, 5)
+
+
+# --- Numba kernel (optional — StatTable.add_many falls back to a NumPy bincount group-by) ---
+
+if _HAS_NUMBA:
+    @njit(cache=True)
+    def _apply_updates(rows, won, pnl, wins, losses, trades, total_pnl):
+        for j in range(rows.shape[0]):
+            i = rows[j]
+            trades[i] += 1
+            total_pnl[i] += pnl[j]
+            if won[j]:
+                wins[i] += 1
+            else:
+                losses[i] += 1
+
+
+_kernels_warm = False
+
+
+def _warm_kernels():
+    """Compile (or load from cache) the Numba kernel once, before the first history load."""
+    global _kernels_warm
+    if _kernels_warm or not _HAS_NUMBA:
+        return
+    _apply_updates(np.zeros(1, dtype=np.int64), np.ones(1, dtype=np.bool_), np.zeros(1),
+                   np.zeros(1, dtype=np.int64), np.zeros(1, dtype=np.int64),
+                   np.zeros(1, dtype=np.int64), np.zeros(1))
+    _kernels_warm = True
+
+
+def format_combo_reason(details: dict) -> str:
+    """Human-readable reason for a get_signal_combo_bias result's details."""
+    code = details.get("reason_code", REASON_NO_DATA)
+    if code == REASON_NO_DATA:
+        return REASON_TEMPLATES[code]
+    trades = details["trades"]
+    return REASON_TEMPLATES[code].format(wr=details["wins"] / trades * 100, trades=trades)
+
+
+@lru_cache(maxsize=512)
+def _combo_key(signal_types: Tuple[str, ...]) -> str:
+    """Order-independent key for a set of signal types (small alphabet, so heavily reused)."""
+    return "+".join(sorted(set(signal_types)))
+
+
+class StatTable:
+    """Win/loss/PnL counters per key, stored as parallel NumPy columns (row i = keys[i])."""
+
+    def __init__(self, capacity: int = 16):
+        self.index: Dict[str, int] = {}
+        self.keys: List[str] = []
+        self.wins = np.zeros(capacity, dtype=np.int64)
+        self.losses = np.zeros(capacity, dtype=np.int64)
+        self.trades = np.zeros(capacity, dtype=np.int64)
+        self.total_pnl = np.zeros(capacity, dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.index
+
+    def _row(self, key: str) -> int:
+        i = self.index.get(key)
+        if i is None:
+            i = len(self.keys)
+            if i == self.trades.shape[0]:
+                self._grow()
+            self.index[key] = i
+            self.keys.append(key)
+        return i
+
+    def _grow(self):
+        cap = self.trades.shape[0] * 2
+        for name in ("wins", "losses", "trades", "total_pnl"):
+            old = getattr(self, name)
+            new = np.zeros(cap, dtype=old.dtype)
+            new[:old.shape[0]] = old
+            setattr(self, name, new)
+
+    def add(self, key: str, won: bool, pnl: float):
+        i = self._row(key)
+        self.trades[i] += 1
+        self.total_pnl[i] += pnl
+        if won:
+            self.wins[i] += 1
+        else:
+            self.losses[i] += 1
+
+    def add_many(self, keys: List[str], won: np.ndarray, pnl: np.ndarray):
+        """
+        Bulk add. Each record's row is resolved through a per-call key->row map (one
+        probe of the table index per distinct key, rows created in first-seen order);
+        records are then applied in one native loop with Numba, or grouped per row with
+        np.bincount otherwise.
+        """
+        if not keys:
+            return
+        row_of: Dict[str, int] = {}
+        for k in keys:
+            if k not in row_of:
+                row_of[k] = self._row(k)
+        rows = np.fromiter((row_of[k] for k in keys), dtype=np.int64, count=len(keys))
+
+        if _HAS_NUMBA:
+            _apply_updates(rows, np.asarray(won, dtype=np.bool_), np.asarray(pnl, dtype=np.float64),
+                           self.wins, self.losses, self.trades, self.total_pnl)
+            return
+
+        m = len(self.keys)
+        trades = np.bincount(rows, minlength=m)
+        wins = np.bincount(rows, weights=won, minlength=m).astype(np.int64)
+        self.trades[:m] += trades
+        self.wins[:m] += wins
+        self.losses[:m] += trades - wins
+        self.total_pnl[:m] += np.bincount(rows, weights=pnl, minlength=m)
+
+    def load(self, rows: List[tuple]):
+        """Replace contents with persisted (key, wins, losses, total_pnl, trades) rows."""
+        self.clear()
+        if not rows:
+            return
+        keys, wins, losses, total_pnl, trades = zip(*rows)
+        n = len(keys)
+        while self.trades.shape[0] < n:
+            self._grow()
+        self.keys.extend(keys)
+        self.index.update(zip(keys, range(n)))
+        self.wins[:n] = wins
+        self.losses[:n] = losses
+        self.total_pnl[:n] = total_pnl
+        self.trades[:n] = trades
+
+    def rows(self, kind: str) -> List[tuple]:
+        """Contents as (kind, key, wins, losses, total_pnl, trades) rows for persistence."""
+        n = len(self.keys)
+        return list(zip([kind] * n, self.keys, self.wins[:n].tolist(), self.losses[:n].tolist(),
+                        self.total_pnl[:n].tolist(), self.trades[:n].tolist()))
+
+    def clear(self):
+        self.index.clear()
+        self.keys.clear()
+        for arr in (self.wins, self.losses, self.trades, self.total_pnl):
+            arr.fill(0)
+
+    def get(self, key: str, default=None) -> Optional[dict]:
+        """Dict view of one row ({wins, losses, total_pnl, trades})."""
+        i = self.index.get(key)
+        if i is None:
+            return default
+        return {
+            "wins": int(self.wins[i]), "losses": int(self.losses[i]),
+            "total_pnl": float(self.total_pnl[i]), "trades": int(self.trades[i]),
+        }
+
+    def summary(self, min_trades: int = 0, skip_sep: Optional[str] = None) -> Dict[str, dict]:
+        """{key: {win_rate, trades, pnl}} for every row, win rates computed in one pass."""
+        n = len(self.keys)
+        trades = self.trades[:n]
+        win_rates = (self.wins[:n] / np.maximum(trades, 1) * 100).tolist()
+        out = {}
+        for key, wr, t, pnl in zip(self.keys, win_rates, trades.tolist(), self.total_pnl[:n].tolist()):
+            if t < min_trades or (skip_sep and skip_sep in key):
+                continue
+            out[key] = {"win_rate": round(wr, 1), "trades": t, "pnl": round(pnl, 2)}
+        return out
+
 
 class TradeLearner:
     """
@@ -18,162 +217,141 @@ class TradeLearner:
 
     def __init__(self, database: DatabaseManager):
         self.db = database
-        self._combo_stats: Dict[str, dict] = {}
-        self._symbol_stats: Dict[str, dict] = {}
-        self._strategy_stats: Dict[str, dict] = {}
+        self._combo_stats = StatTable()
+        self._symbol_stats = StatTable()
+        self._strategy_stats = StatTable()
         self._loaded = False
+        _warm_kernels()
 
     async def load_history(self):
-        """Load closed trades from DB and build statistics."""
-        positions = await self.db.get_recent_positions(200)
-        closed = [p for p in positions if p.status.value == "closed" and p.pnl is not None]
-
-        self._combo_stats.clear()
-        self._symbol_stats.clear()
-        self._strategy_stats.clear()
-
-        for pos in closed:
-            won = pos.pnl > 0
-            pnl = pos.pnl
-
-            sym = pos.symbol
-            strat = pos.strategy.value
-
-            self._update_stat(self._symbol_stats, sym, won, pnl)
-            self._update_stat(self._strategy_stats, strat, won, pnl)
+        """
+        Load aggregated statistics from the learner_stats table. The symbol and strategy
+        rows are kept current by the database on every close; on first run the table is
+        seeded from the closed-position history.
+        """
+        rows = await self.db.get_learner_stats()
+        if not rows:
+            rows = await self._seed_from_positions()
+
+        by_kind: Dict[str, List[tuple]] = {"symbol": [], "strategy": [], "combo": []}
+        for kind, key, wins, losses, total_pnl, trades in rows:
+            if kind in by_kind:
+                by_kind[kind].append((key, wins, losses, total_pnl, trades))
+        self._symbol_stats.load(by_kind["symbol"])
+        self._strategy_stats.load(by_kind["strategy"])
+        self._combo_stats.load(by_kind["combo"])
 
         self._loaded = True
         logger.info(
-            f"Trade learner loaded: {len(closed)} trades | "
+            f"Trade learner loaded: {int(self._strategy_stats.trades.sum())} trades | "
             f"{len(self._symbol_stats)} symbols | {len(self._strategy_stats)} strategies"
         )
 
-    def record_trade(self, symbol: str, strategy: str, signal_types: List[str],
-                     won: bool, pnl: float):
-        """Record a completed trade for learning."""
-        self._update_stat(self._symbol_stats, symbol, won, pnl)
-        self._update_stat(self._strategy_stats, strategy, won, pnl)
+    async def _seed_from_positions(self) -> List[tuple]:
+        closed = await self.db.get_closed_positions()
+        if not closed:
+            return []
 
-        combo_key = "+".join(sorted(set(signal_types)))
-        self._update_stat(self._combo_stats, combo_key, won, pnl)
+        symbols, strategies = StatTable(), StatTable()
+        pnl = np.fromiter((p.pnl for p in closed), dtype=np.float64, count=len(closed))
+        won = pnl > 0
+        symbols.add_many([p.symbol for p in closed], won, pnl)
+        strategies.add_many([p.strategy.value for p in closed], won, pnl)
 
-        combo_sym_key = f"{symbol}|{combo_key}"
-        self._update_stat(self._combo_stats, combo_sym_key, won, pnl)
+        rows = symbols.rows("symbol") + strategies.rows("strategy")
+        await self.db.replace_learner_stats(rows)
+        logger.info(f"Trade learner seeded stats from {len(closed)} closed trades")
+        return rows
 
-    def _update_stat(self, store: dict, key: str, won: bool, pnl: float):
-        if key not in store:
-            store[key] = {"wins": 0, "losses": 0, "total_pnl": 0.0, "trades": 0}
-        s = store[key]
-        s["trades"] += 1
-        s["total_pnl"] += pnl
-        if won:
-            s["wins"] += 1
-        else:
-            s["losses"] += 1
+    async def record_trade(self, symbol: str, strategy: str, signal_types: List[str],
+                           won: bool, pnl: float):
+        """
+        Record a completed trade for learning. Symbol and strategy totals are persisted
+        by the database when the position closes; combo totals are persisted here.
+        """
+        self._symbol_stats.add(symbol, won, pnl)
+        self._strategy_stats.add(strategy, won, pnl)
+
+        combo_key = _combo_key(tuple(signal_types))
+        self._combo_stats.add(combo_key, won, pnl)
+        self._combo_stats.add(f"{symbol}|{combo_key}", won, pnl)
+        await self.db.add_learner_stats(
+            [("combo", combo_key), ("combo", f"{symbol}|{combo_key}")], won, pnl
+        )
 
-    def get_signal_combo_bias(self, symbol: str, signal_types: List[str]) -> dict:
+    def get_signal_combo_bias(self, symbol: str, signal_types: List[str]) -> BiasResult:
         """
         Returns a score adjustment based on historical performance
-        of this signal combination.
+        of this signal combination. The reason is left as a code in details;
+        use format_combo_reason to render it.
         """
-        combo_key = "+".join(sorted(set(signal_types)))
-
-        combo_sym_key = f"{symbol}|{combo_key}"
-        stat = self._combo_stats.get(combo_sym_key)
-        if not stat or stat["trades"] < MIN_SAMPLES:
-            stat = self._combo_stats.get(combo_key)
-
-        if not stat or stat["trades"] < MIN_SAMPLES:
-            return {"bias": 0, "reason": "Not enough data", "win_rate": 0, "trades": 0}
-
-        win_rate = stat["wins"] / stat["trades"]
-        avg_pnl = stat["total_pnl"] / stat["trades"]
-
-        if win_rate >= 0.65:
-            bias = 10
-            reason = f"Strong combo: {win_rate*100:.0f}% WR over {stat['trades']} trades"
-        elif win_rate >= 0.55:
-            bias = 5
-            reason = f"Good combo: {win_rate*100:.0f}% WR over {stat['trades']} trades"
-        elif win_rate <= 0.35:
-            bias = -15
-            reason = f"Weak combo: {win_rate*100:.0f}% WR over {stat['trades']} trades"
-        elif win_rate <= 0.45:
-            bias = -8
-            reason = f"Below average: {win_rate*100:.0f}% WR over {stat['trades']} trades"
-        else:
-            bias = 0
-            reason = f"Neutral: {win_rate*100:.0f}% WR over {stat['trades']} trades"
+        combo_key = _combo_key(tuple(signal_types))
+
+        table = self._combo_stats
+        i = table.index.get(f"{symbol}|{combo_key}")
+        if i is None or table.trades[i] < MIN_SAMPLES:
+            i = table.index.get(combo_key)
 
-        return {"bias": bias, "reason": reason,
-                "win_rate": round(win_rate * 100, 1), "trades": stat["trades"]}
+        if i is None or table.trades[i] < MIN_SAMPLES:
+            return BiasResult(details={"win_rate": 0, "trades": 0, "reason_code": REASON_NO_DATA})
+
+        trades = int(table.trades[i])
+        wins = int(table.wins[i])
+        win_rate = wins / trades
+
+        band = bisect_left(_COMBO_LOSS_BOUNDS, win_rate) + bisect_right(_COMBO_WIN_BOUNDS, win_rate)
+        return BiasResult(bias=_COMBO_BIAS[band], details={
+            "win_rate": round(win_rate * 100, 1), "trades": trades, "wins": wins,
+            "reason_code": REASON_WEAK + band,
+        })
 
     def get_strategy_bias(self, strategy: str) -> int:
-        stat = self._strategy_stats.get(strategy)
-        if not stat or stat["trades"] < MIN_SAMPLES:
+        table = self._strategy_stats
+        i = table.index.get(strategy)
+        if i is None or table.trades[i] < MIN_SAMPLES:
             return 0
 
-        win_rate = stat["wins"] / stat["trades"]
-        if win_rate >= 0.60:
-            return 5
-        elif win_rate <= 0.35:
-            return -10
-        return 0
+        win_rate = int(table.wins[i]) / int(table.trades[i])
+        return _STRATEGY_BIAS[
+            bisect_left(_STRATEGY_LOSS_BOUNDS, win_rate) + bisect_right(_STRATEGY_WIN_BOUNDS, win_rate)
+        ]
 
     def get_symbol_bias(self, symbol: str) -> int:
-        stat = self._symbol_stats.get(symbol)
-        if not stat or stat["trades"] < MIN_SAMPLES:
+        table = self._symbol_stats
+        i = table.index.get(symbol)
+        if i is None or table.trades[i] < MIN_SAMPLES:
             return 0
 
-        win_rate = stat["wins"] / stat["trades"]
-        avg_pnl = stat["total_pnl"] / stat["trades"]
+        trades = int(table.trades[i])
+        win_rate = int(table.wins[i]) / trades
+        avg_pnl = float(table.total_pnl[i]) / trades
 
-        if win_rate <= 0.35 and avg_pnl < 0:
-            return -12
-        elif win_rate >= 0.60:
-            return 5
-        return 0
+        # Same bands as the strategy table, but the losing band only counts when PnL agrees
+        band = bisect_left(_STRATEGY_LOSS_BOUNDS, win_rate) + bisect_right(_STRATEGY_WIN_BOUNDS, win_rate)
+        if band == 0:
+            return -12 if avg_pnl < 0 else 0
+        return 5 if band == 2 else 0
 
     def should_skip_symbol(self, symbol: str) -> dict:
         """If a symbol consistently loses, recommend skipping it."""
-        stat = self._symbol_stats.get(symbol)
-        if not stat or stat["trades"] < 10:
+        table = self._symbol_stats
+        i = table.index.get(symbol)
+        if i is None or table.trades[i] < 10:
             return {"skip": False, "reason": ""}
 
-        win_rate = stat["wins"] / stat["trades"]
-        if win_rate <= 0.30 and stat["total_pnl"] < -50:
+        trades = int(table.trades[i])
+        total_pnl = float(table.total_pnl[i])
+        win_rate = int(table.wins[i]) / trades
+        if win_rate <= 0.30 and total_pnl < -50:
             return {
                 "skip": True,
-                "reason": f"{symbol} has {win_rate*100:.0f}% WR and ${stat['total_pnl']:.2f} PnL over {stat['trades']} trades"
+                "reason": f"{symbol} has {win_rate*100:.0f}% WR and ${total_pnl:.2f} PnL over {trades} trades"
             }
         return {"skip": False, "reason": ""}
 
     def get_summary(self) -> dict:
-        summary = {"combos": {}, "symbols": {}, "strategies": {}}
-
-        for key, stat in self._combo_stats.items():
-            if stat["trades"] >= MIN_SAMPLES and "|" not in key:
-                wr = stat["wins"] / stat["trades"] * 100
-                summary["combos"][key] = {
-                    "win_rate": round(wr, 1),
-                    "trades": stat["trades"],
-                    "pnl": round(stat["total_pnl"], 2),
-                }
-
-        for key, stat in self._symbol_stats.items():
-            wr = stat["wins"] / stat["trades"] * 100 if stat["trades"] > 0 else 0
-            summary["symbols"][key] = {
-                "win_rate": round(wr, 1),
-                "trades": stat["trades"],
-                "pnl": round(stat["total_pnl"], 2),
-            }
-
-        for key, stat in self._strategy_stats.items():
-            wr = stat["wins"] / stat["trades"] * 100 if stat["trades"] > 0 else 0
-            summary["strategies"][key] = {
-                "win_rate": round(wr, 1),
-                "trades": stat["trades"],
-                "pnl": round(stat["total_pnl"], 2),
-            }
-
-        return summary
+        return {
+            "combos": self._combo_stats.summary(min_trades=MIN_SAMPLES, skip_sep="|"),
+            "symbols": self._symbol_stats.summary(),
+            "strategies": self._strategy_stats.summary(),
+        }
@@ -1,6 +1,7 @@
 import logging
-from typing import Optional
-from models import Position, Side
+import numpy as np
+from typing import List, Optional, Sequence, Tuple
+from models import Position, Side, side_signs
 
 logger = logging.getLogger("trailing")
 
@@ -9,20 +10,19 @@ class TrailingStopManager:
     """
     Manages trailing stop-losses that follow price in the profitable direction.
     Activates after price moves a configurable percentage in our favor.
+    The current trail lives on the position itself (Position.trailing_sl).
     """
 
     def __init__(self, activation_pct: float = 0.3, trail_pct: float = 0.2):
         self.activation_pct = activation_pct
         self.trail_pct = trail_pct
-        self._trailing_stops: dict = {}  # position_id -> current trailing SL
 
     def update(self, position: Position, current_price: float) -> Optional[float]:
         """
         Returns updated stop-loss if trailing should adjust, else None.
         """
-        pos_id = position.id
         original_sl = position.stop_loss
-        current_trail = self._trailing_stops.get(pos_id)
+        current_trail = position.trailing_sl
 
         if position.side == Side.BUY:
             move_pct = (current_price - position.entry_price) / position.entry_price * 100
@@ -33,15 +33,12 @@ class TrailingStopManager:
 
             if current_trail is None:
                 if new_trail > original_sl:
-                    self._trailing_stops[pos_id] = new_trail
-                    logger.info(
-                        f"[{pos_id}] Trailing activated: SL {original_sl:.2f} → {new_trail:.2f} "
-                        f"(price at {current_price:.2f}, +{move_pct:.2f}%)"
-                    )
+                    position.trailing_sl = new_trail
+                    self._log_activation(position, original_sl, new_trail, current_price, move_pct)
                     return new_trail
             elif new_trail > current_trail:
-                self._trailing_stops[pos_id] = new_trail
-                logger.debug(f"[{pos_id}] Trail updated: {current_trail:.2f} → {new_trail:.2f}")
+                position.trailing_sl = new_trail
+                logger.debug(f"[{position.id}] Trail updated: {current_trail:.2f} → {new_trail:.2f}")
                 return new_trail
 
         else:  # SELL
@@ -53,26 +50,70 @@ class TrailingStopManager:
 
             if current_trail is None:
                 if new_trail < original_sl:
-                    self._trailing_stops[pos_id] = new_trail
-                    logger.info(
-                        f"[{pos_id}] Trailing activated: SL {original_sl:.2f} → {new_trail:.2f} "
-                        f"(price at {current_price:.2f}, +{move_pct:.2f}%)"
-                    )
+                    position.trailing_sl = new_trail
+                    self._log_activation(position, original_sl, new_trail, current_price, move_pct)
                     return new_trail
             elif new_trail < current_trail:
-                self._trailing_stops[pos_id] = new_trail
-                logger.debug(f"[{pos_id}] Trail updated: {current_trail:.2f} → {new_trail:.2f}")
+                position.trailing_sl = new_trail
+                logger.debug(f"[{position.id}] Trail updated: {current_trail:.2f} → {new_trail:.2f}")
                 return new_trail
 
         return None
 
+    def update_batch(self, positions: List[Position],
+                     prices: Sequence[float]) -> List[Tuple[Position, float]]:
+        """
+        Vectorized update over a portfolio. Returns (position, new stop-loss) for
+        the positions whose trail moved, same decisions as calling update() on each.
+        """
+        n = len(positions)
+        if n == 0:
+            return []
+        px = np.asarray(prices, dtype=np.float64)
+        sign = side_signs(positions)
+        entry = np.fromiter((p.entry_price for p in positions), dtype=np.float64, count=n)
+        # The trail only ratchets past the current trail, or the original SL before activation
+        ref = np.fromiter(
+            (p.stop_loss if p.trailing_sl is None else p.trailing_sl for p in positions),
+            dtype=np.float64, count=n,
+        )
+
+        move_pct = sign * (px - entry) / entry * 100
+        factor = np.where(sign > 0, 1 - self.trail_pct / 100, 1 + self.trail_pct / 100)
+        new_trail = px * factor
+        moved = (move_pct >= self.activation_pct) & (sign * (new_trail - ref) > 0)
+
+        updates = []
+        for i in np.flatnonzero(moved).tolist():
+            pos = positions[i]
+            trail = float(new_trail[i])
+            if pos.trailing_sl is None:
+                self._log_activation(pos, pos.stop_loss, trail, float(px[i]), float(move_pct[i]))
+            else:
+                logger.debug(f"[{pos.id}] Trail updated: {pos.trailing_sl:.2f} → {trail:.2f}")
+            pos.trailing_sl = trail
+            updates.append((pos, trail))
+        return updates
+
+    @staticmethod
+    def _log_activation(position: Position, original_sl: float, new_trail: float,
+                        current_price: float, move_pct: float):
+        # Positions reloaded from the DB start without a trail; if their stop is already
+        # on the profitable side of entry it was trailed before, so this is just an update
+        trailed = (original_sl > position.entry_price if position.side == Side.BUY
+                   else original_sl < position.entry_price)
+        if trailed:
+            logger.debug(f"[{position.id}] Trail updated: {original_sl:.2f} → {new_trail:.2f}")
+            return
+        logger.info(
+            f"[{position.id}] Trailing activated: SL {original_sl:.2f} → {new_trail:.2f} "
+            f"(price at {current_price:.2f}, +{move_pct:.2f}%)"
+        )
+
     def get_effective_sl(self, position: Position) -> float:
-        trail = self._trailing_stops.get(position.id)
+        trail = position.trailing_sl
         if trail is not None:
             if position.side == Side.BUY:
                 return max(trail, position.stop_loss)
             return min(trail, position.stop_loss)
         return position.stop_loss
-
-    def remove(self, position_id: str):
-        self._trailing_stops.pop(position_id, None)
@@ -1,11 +1,35 @@
 import logging
-import math
-from typing import Dict, List, Optional
-from collections import defaultdict
-from models import FootprintCandle
+import numpy as np
+from typing import Dict, Optional
+from models import FootprintCandle, BiasResult
 
 logger = logging.getLogger("vprofile")
 
+_INIT_BUCKETS = 1024
+
+# get_signal_bias results: level type -> (bias, reason template over the value area)
+_LEVEL_BIAS = {
+    "poc": (0, "At POC ({poc:.2f})"),
+    "below_va": (8, "Below Value Area Low ({low:.2f}), mean reversion up likely"),
+    "above_va": (-8, "Above Value Area High ({high:.2f}), mean reversion down likely"),
+    "below_poc": (5, "Below POC ({poc:.2f}) — pull up"),
+    "above_poc": (-5, "Above POC ({poc:.2f}) — pull down"),
+}
+_NO_PROFILE_BIAS = BiasResult(reason="No profile data", details={"level_type": "none"})
+_INSIDE_VA_BIAS = BiasResult(reason="Inside value area", details={"level_type": "inside_va"})
+
+
+def _bucketize(candle: FootprintCandle, scale: float) -> tuple:
+    """
+    (first bucket, per-bucket volumes) for a candle at the given scale: the candle's
+    levels summed into a dense run of buckets with one np.bincount.
+    """
+    buckets = np.floor(candle.price_array / scale).astype(np.int64)
+    if buckets.size == 0:
+        return 0, np.zeros(0)
+    lo = int(buckets.min())
+    return lo, np.bincount(buckets - lo, weights=candle.volume_array)
+
 
 class CompositeVolumeProfile:
     """
@@ -15,53 +39,142 @@ class CompositeVolumeProfile:
 
     def __init__(self, scale: float = 0.5):
         self.scale = scale
-        self._levels: Dict[float, float] = defaultdict(float)
+        # Volume per integer price bucket floor(price / scale); slot i holds bucket _base + i
+        self._vol = np.zeros(_INIT_BUCKETS, dtype=np.float64)
+        self._base: Optional[int] = None
         self._candle_count = 0
-
-    def _price_to_level(self, price: float) -> float:
-        return math.floor(price / self.scale) * self.scale
+        # Running aggregates maintained at write time (POC as an absolute bucket)
+        self._total = 0.0
+        self._poc_bucket: Optional[int] = None
+        self._poc_vol = 0.0
+        # Derived views (occupied buckets, volume order, cumsum, memoized getter results);
+        # rebuilt lazily after the profile changes
+        self._dirty = True
+        self._cache: Dict = {}
+
+    def _ensure_range(self, lo: int, hi: int):
+        """Grow the bucket array (doubling) so buckets lo..hi are addressable."""
+        size = self._vol.shape[0]
+        if self._base is None:
+            span = hi - lo + 1
+            while size < span:
+                size *= 2
+            if size != self._vol.shape[0]:
+                self._vol = np.zeros(size, dtype=np.float64)
+            self._base = lo - (size - span) // 2
+            return
+
+        base = self._base
+        if lo >= base and hi < base + size:
+            return
+
+        new_lo = min(lo, base)
+        span = max(hi, base + size - 1) - new_lo + 1
+        new_size = size * 2
+        while new_size < span:
+            new_size *= 2
+        # Leave the spare room on the side the price is moving towards
+        new_base = new_lo - (new_size - span) if lo < base else new_lo
+        vol = np.zeros(new_size, dtype=np.float64)
+        vol[base - new_base:base - new_base + size] = self._vol
+        self._vol = vol
+        self._base = new_base
 
     def add_candle(self, candle: FootprintCandle):
         """Add a candle's volume data to the composite profile."""
-        for price, level in candle.levels.items():
-            rounded = self._price_to_level(price)
-            self._levels[rounded] += level.total_volume
+        self._add_bucketized(*_bucketize(candle, self.scale))
+
+    def _add_bucketized(self, lo: int, seg: np.ndarray):
+        """Add one candle already summed per bucket (buckets lo .. lo + len(seg) - 1)."""
+        n = seg.shape[0]
+        if n:
+            self._ensure_range(lo, lo + n - 1)
+            start = lo - self._base
+            region = self._vol[start:start + n]
+            region += seg
+            self._total += float(seg.sum())
+
+            # Only this run can overtake the POC (untouched buckets in it are <= the POC
+            # already); argmax picks the lowest bucket, matching the tie rule
+            peak_at = int(region.argmax())
+            peak = float(region[peak_at])
+            if peak >= self._poc_vol:
+                bucket = lo + peak_at
+                if (peak > self._poc_vol or self._poc_bucket is None
+                        or bucket < self._poc_bucket):
+                    self._poc_vol = peak
+                    self._poc_bucket = bucket
         self._candle_count += 1
+        self._dirty = True
 
     def reset(self):
-        self._levels.clear()
+        self._vol.fill(0.0)
         self._candle_count = 0
+        self._total = 0.0
+        self._poc_bucket = None
+        self._poc_vol = 0.0
+        self._dirty = True
+
+    def _derived(self) -> dict:
+        if self._dirty:
+            self._recompute()
+        return self._cache
+
+    def _recompute(self):
+        slots = np.flatnonzero(self._vol)
+        vols = self._vol[slots]
+        order = np.argsort(-vols, kind="stable")
+        # One sort + cumsum serves total, POC and every value-area pct
+        cumulative = np.cumsum(vols[order])
+        # Everything derived is keyed by absolute integer bucket, never by array slot
+        # (slots shift when the array grows) or by float price (converted on output only)
+        buckets = slots + (self._base or 0)
+        self._cache = {
+            "buckets": buckets,
+            "vols": vols,
+            "order": order,
+            "ranked": buckets[order],
+            "cumulative": cumulative,
+            "total": float(cumulative[-1]) if cumulative.size else 0.0,
+        }
+        self._dirty = False
+
+    def _bucket_price(self, bucket: int) -> float:
+        return bucket * self.scale
 
     @property
     def total_volume(self) -> float:
-        return sum(self._levels.values())
+        return self._total
 
     def get_poc(self) -> Optional[float]:
-        if not self._levels:
+        if self._poc_bucket is None:
             return None
-        return max(self._levels, key=self._levels.get)
+        return self._bucket_price(self._poc_bucket)
 
     def get_value_area(self, pct: float = 0.70) -> dict:
-        if not self._levels:
+        d = self._derived()
+        key = ("va", pct)
+        va = d.get(key)
+        if va is None:
+            va = d[key] = self._value_area(d, pct)
+        return va
+
+    def _value_area(self, d: dict, pct: float) -> dict:
+        ranked = d["ranked"]
+        if ranked.size == 0:
             return {"high": 0, "low": 0, "poc": 0}
 
-        sorted_levels = sorted(self._levels.items(), key=lambda x: x[1], reverse=True)
-        poc = sorted_levels[0][0]
-        target = self.total_volume * pct
-        accumulated = 0
-        included = []
-
-        for price, vol in sorted_levels:
-            if accumulated >= target:
-                break
-            accumulated += vol
-            included.append(price)
+        cumulative = d["cumulative"]
+        target = d["total"] * pct
+        # Levels are taken while the running total is still below target
+        k = min(int(np.searchsorted(cumulative, target)) + 1, ranked.size) if target > 0 else 0
+        included = ranked[:k]
 
         return {
-            "high": max(included) if included else 0,
-            "low": min(included) if included else 0,
-            "poc": poc,
-            "poc_volume": self._levels.get(poc, 0),
+            "high": self._bucket_price(int(included.max())) if k else 0,
+            "low": self._bucket_price(int(included.min())) if k else 0,
+            "poc": self._bucket_price(int(ranked[0])),
+            "poc_volume": float(cumulative[0]),
         }
 
     def get_hvn_lvn(self, top_n: int = 3) -> dict:
@@ -69,22 +182,37 @@ class CompositeVolumeProfile:
         High Volume Nodes = levels with most volume (support/resistance).
         Low Volume Nodes = gaps with least volume (price moves fast through these).
         """
-        if len(self._levels) < 5:
+        d = self._derived()
+        key = ("hvn_lvn", top_n)
+        nodes = d.get(key)
+        if nodes is None:
+            nodes = d[key] = self._hvn_lvn(d, top_n)
+        return nodes
+
+    def _hvn_lvn(self, d: dict, top_n: int) -> dict:
+        buckets, vols = d["buckets"], d["vols"]
+        if buckets.size < 5:
             return {"hvn": [], "lvn": []}
 
-        sorted_levels = sorted(self._levels.items(), key=lambda x: x[1], reverse=True)
-        avg_vol = self.total_volume / len(self._levels)
+        avg_vol = d["total"] / buckets.size
 
-        hvn = [{"price": p, "volume": v, "ratio": v / avg_vol}
-               for p, v in sorted_levels[:top_n]]
+        def node(i: int) -> dict:
+            v = float(vols[i])
+            return {"price": self._bucket_price(int(buckets[i])), "volume": v, "ratio": v / avg_vol}
 
-        lvn_sorted = sorted(self._levels.items(), key=lambda x: x[1])
-        lvn = [{"price": p, "volume": v, "ratio": v / avg_vol}
-               for p, v in lvn_sorted[:top_n] if v < avg_vol * 0.3]
+        hvn = [node(i) for i in d["order"][:top_n].tolist()]
+
+        # Thin levels form a prefix of the ascending order, so select the top_n smallest
+        # of those with a partial partition and sort only that slice
+        thin = np.flatnonzero(vols < avg_vol * 0.3)
+        if thin.size > top_n:
+            thin = thin[np.argpartition(vols[thin], top_n - 1)[:top_n]] if top_n > 0 else thin[:0]
+        thin = thin[np.lexsort((thin, vols[thin]))]
+        lvn = [node(i) for i in thin.tolist()]
 
         return {"hvn": hvn, "lvn": lvn}
 
-    def get_signal_bias(self, current_price: float) -> dict:
+    def get_signal_bias(self, current_price: float) -> BiasResult:
         """
         Returns bias based on price position relative to composite profile.
         Price below POC = bullish magnet pull up. Above = bearish pull down.
@@ -93,64 +221,79 @@ class CompositeVolumeProfile:
         va = self.get_value_area()
         poc = va["poc"]
         if poc == 0 or current_price == 0:
-            return {"bias": 0, "reason": "No profile data", "level_type": "none"}
+            return _NO_PROFILE_BIAS
 
         distance_pct = (current_price - poc) / poc * 100
 
         if abs(distance_pct) < 0.05:
-            return {"bias": 0, "reason": f"At POC ({poc:.2f})", "level_type": "poc"}
-
+            return self._level_bias("poc", va)
         if current_price < va["low"]:
-            return {
-                "bias": 8,
-                "reason": f"Below Value Area Low ({va['low']:.2f}), mean reversion up likely",
-                "level_type": "below_va",
-            }
-
+            return self._level_bias("below_va", va)
         if current_price > va["high"]:
-            return {
-                "bias": -8,
-                "reason": f"Above Value Area High ({va['high']:.2f}), mean reversion down likely",
-                "level_type": "above_va",
-            }
-
+            return self._level_bias("above_va", va)
         if distance_pct < -0.2:
-            return {"bias": 5, "reason": f"Below POC ({poc:.2f}) — pull up", "level_type": "below_poc"}
-
+            return self._level_bias("below_poc", va)
         if distance_pct > 0.2:
-            return {"bias": -5, "reason": f"Above POC ({poc:.2f}) — pull down", "level_type": "above_poc"}
-
-        return {"bias": 0, "reason": "Inside value area", "level_type": "inside_va"}
+            return self._level_bias("above_poc", va)
+        return _INSIDE_VA_BIAS
+
+    def _level_bias(self, level_type: str, va: dict) -> BiasResult:
+        """Shared result per level type; reasons only depend on the value area, so they
+        are built once per profile change instead of once per call."""
+        d = self._derived()
+        key = ("bias", level_type)
+        result = d.get(key)
+        if result is None:
+            bias, template = _LEVEL_BIAS[level_type]
+            result = d[key] = BiasResult(
+                bias=bias, reason=template.format_map(va), details={"level_type": level_type},
+            )
+        return result
 
     def get_analysis(self) -> dict:
-        va = self.get_value_area()
-        hvn_lvn = self.get_hvn_lvn()
-        return {
-            "poc": va["poc"],
-            "va_high": va["high"],
-            "va_low": va["low"],
-            "total_volume": round(self.total_volume, 2),
-            "candles": self._candle_count,
-            "levels": len(self._levels),
-            "hvn": hvn_lvn["hvn"],
-            "lvn": hvn_lvn["lvn"],
-        }
+        return self._compute_all()
+
+    def _compute_all(self) -> dict:
+        """POC, value area, HVN/LVN and totals as one bundle, built from the shared sorted
+        view once per profile change."""
+        d = self._derived()
+        bundle = d.get("analysis")
+        if bundle is None:
+            va = self.get_value_area()
+            hvn_lvn = self.get_hvn_lvn()
+            bundle = d["analysis"] = {
+                "poc": va["poc"],
+                "va_high": va["high"],
+                "va_low": va["low"],
+                "total_volume": round(self.total_volume, 2),
+                "candles": self._candle_count,
+                "levels": int(d["buckets"].size),
+                "hvn": hvn_lvn["hvn"],
+                "lvn": hvn_lvn["lvn"],
+            }
+        return bundle
 
 
 class MultiPeriodProfile:
     """Manages composite profiles for multiple time periods (session, daily, weekly)."""
 
     def __init__(self, scale: float = 0.5):
+        self.scale = scale
         self.session = CompositeVolumeProfile(scale)
         self.daily = CompositeVolumeProfile(scale)
         self.weekly = CompositeVolumeProfile(scale)
         self._session_candles = 0
         self._daily_candles = 0
+        # get_combined_bias results keyed by (daily, weekly) level types; an entry is valid
+        # while both profiles still hand back the same per-level result objects
+        self._combined_cache: Dict[tuple, tuple] = {}
 
     def add_candle(self, candle: FootprintCandle):
-        self.session.add_candle(candle)
-        self.daily.add_candle(candle)
-        self.weekly.add_candle(candle)
+        # Bucketize once and scatter into all three profiles (they share the scale)
+        lo, seg = _bucketize(candle, self.scale)
+        self.session._add_bucketized(lo, seg)
+        self.daily._add_bucketized(lo, seg)
+        self.weekly._add_bucketized(lo, seg)
 
         self._session_candles += 1
         self._daily_candles += 1
@@ -165,23 +308,26 @@ class MultiPeriodProfile:
             self.daily.reset()
             self._daily_candles = 0
 
-    def get_combined_bias(self, current_price: float) -> dict:
+    def get_combined_bias(self, current_price: float) -> BiasResult:
         daily_bias = self.daily.get_signal_bias(current_price)
         weekly_bias = self.weekly.get_signal_bias(current_price)
 
+        key = (daily_bias.details["level_type"], weekly_bias.details["level_type"])
+        cached = self._combined_cache.get(key)
+        if cached is not None and cached[0] is daily_bias and cached[1] is weekly_bias:
+            return cached[2]
+
         # Weekly profile carries more weight
-        combined = daily_bias["bias"] + weekly_bias["bias"] * 1.5
+        combined = daily_bias.bias + weekly_bias.bias * 1.5
         combined = max(-15, min(15, int(combined)))
 
-        return {
-            "bias": combined,
-            "daily": daily_bias,
-            "weekly": weekly_bias,
-        }
+        result = BiasResult(bias=combined, details={"daily": daily_bias, "weekly": weekly_bias})
+        self._combined_cache[key] = (daily_bias, weekly_bias, result)
+        return result
 
     def get_analysis(self) -> dict:
         return {
-            "session": self.session.get_analysis(),
-            "daily": self.daily.get_analysis(),
-            "weekly": self.weekly.get_analysis(),
+            "session": self.session._compute_all(),
+            "daily": self.daily._compute_all(),
+            "weekly": self.weekly._compute_all(),
         }